@@ -7,7 +7,9 @@ from sqlalchemy.orm import Session
 from database import get_db
 from typing import List, Dict
 import structlog
-import json
+import orjson
+import threading
+import time
 from datetime import datetime
 
 logger = structlog.get_logger()
@@ -17,12 +19,22 @@ router = APIRouter()
 # Store active WebSocket connections for live updates
 active_connections: Dict[str, List[WebSocket]] = {}
 
+# Updates are coalesced per call and broadcast at most this often, except on terminal events
+BROADCAST_INTERVAL_SECONDS = 0.25
+TERMINAL_EVENT_TYPES = frozenset({'call_completed', 'auto_hangup', 'call_ended'})
+
 
 class CallMonitor:
     """Singleton class to track active calls and broadcast updates."""
     
     _instance = None
     _active_calls: Dict[str, Dict] = {}
+    # Calls with changes not yet broadcast
+    _dirty_calls: set = set()
+    _last_flush: float = 0.0
+    # Pending trailing flush for updates deferred inside the interval
+    _flush_timer: threading.Timer = None
+    _flush_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -58,7 +70,7 @@ class CallMonitor:
         
         self._active_calls[call_sid]['events'].append(event)
         logger.info(f"📝 Call event", call_sid=call_sid, event_type=event_type, message=message)
-        self._broadcast_update(call_sid)
+        self._broadcast_update(call_sid, force=event_type in TERMINAL_EVENT_TYPES)
     
     def add_conversation(self, call_sid: str, speaker: str, text: str):
         """Add a conversation entry (AI or Human)."""
@@ -109,7 +121,7 @@ class CallMonitor:
         self._active_calls[call_sid]['status'] = final_status
         self._active_calls[call_sid]['ended_at'] = datetime.now().isoformat()
         logger.info(f"☎️ Call ended", call_sid=call_sid, final_status=final_status)
-        self._broadcast_update(call_sid)
+        self._broadcast_update(call_sid, force=True)
     
     def get_call_data(self, call_sid: str) -> dict:
         """Get all data for a specific call."""
@@ -122,15 +134,51 @@ class CallMonitor:
             if call.get('status') not in ['completed', 'failed', 'cancelled']
         ]
     
-    def _broadcast_update(self, call_sid: str):
+    def _broadcast_update(self, call_sid: str, force: bool = False):
+        """
+        Schedule a broadcast for a call.
+        
+        Changes are already visible through get_call_data; broadcasts are batched
+        so a burst of events costs one serialization per call per interval. Updates
+        deferred inside the interval are sent by a trailing flush when it elapses.
+        """
+        with self._flush_lock:
+            self._dirty_calls.add(call_sid)
+            now = time.monotonic()
+            remaining = BROADCAST_INTERVAL_SECONDS - (now - CallMonitor._last_flush)
+            if not force and remaining > 0:
+                if CallMonitor._flush_timer is None:
+                    # The monitor is also called from worker threads, so a timer is used
+                    # rather than the event loop
+                    CallMonitor._flush_timer = threading.Timer(remaining, self._flush_dirty)
+                    CallMonitor._flush_timer.daemon = True
+                    CallMonitor._flush_timer.start()
+                return
+        
+        self._flush_dirty()
+    
+    def _flush_dirty(self):
+        """Broadcast every call with changes not yet sent."""
+        with self._flush_lock:
+            if CallMonitor._flush_timer is not None:
+                CallMonitor._flush_timer.cancel()
+                CallMonitor._flush_timer = None
+            CallMonitor._last_flush = time.monotonic()
+            dirty = list(self._dirty_calls)
+            self._dirty_calls.clear()
+        
+        for sid in dirty:
+            self._send_update(sid)
+    
+    def _send_update(self, call_sid: str):
         """Broadcast update to all connected WebSocket clients."""
         if call_sid in active_connections:
             call_data = self.get_call_data(call_sid)
-            message = json.dumps({
+            message = orjson.dumps({
                 'type': 'call_update',
                 'call_sid': call_sid,
                 'data': call_data
-            })
+            }).decode()
             
             # Send to all connected clients for this call
             disconnected = []
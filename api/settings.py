@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from database import get_db
 from models import SystemSettings, User
 from api.auth import get_current_user
+from services.settings_service import get_runtime_settings
 from typing import Optional, List
 import json
 import logging
@@ -60,6 +61,8 @@ def set_setting(db: Session, key: str, value: str, description: str = None,
         db.add(setting)
     
     db.commit()
+    # Also drops this session's loaded settings, so it reads the new value back
+    get_runtime_settings(db).refresh()
     return setting
 
 
@@ -181,6 +184,7 @@ def init_default_settings(db: Session):
             db.add(setting)
     
     db.commit()
+    get_runtime_settings(db).refresh()
     logger.info("Initialized default settings")
 
 
@@ -252,11 +256,8 @@ async def toggle_mode(
             username=user.username
         )
         
-        # Force reload settings by clearing any cached instances
-        from services.twilio_service import twilio_service
-        if twilio_service:
-            # Re-initialize with new mode
-            logger.info("Reinitializing Twilio service with new mode")
+        # set_setting bumps the settings version, so get_twilio_service() rebuilds
+        # its cached instances in the new mode on next use
         
         logger.info(f"Mode toggled to {mode_name} by {user.username} using database runtime settings.")
         
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Request, Response, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
 from services.twilio_service import get_twilio_service
-from services.call_orchestrator import CallOrchestrator
+from services.call_orchestrator import CallOrchestrator, resolve_call_completion
 from services.verification_service import VerificationService
 from schemas import CallContext
 from config import settings
@@ -15,6 +15,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/twilio", tags=["twilio"])
 
+# Twilio CallStatus values after which a call won't progress further
+TERMINAL_CALL_STATUSES = frozenset({"completed", "busy", "no-answer", "failed", "canceled"})
+
 
 @router.post("/voice")
 async def handle_voice_webhook(
@@ -145,6 +148,10 @@ async def handle_status_callback(
             
             db.commit()
         
+        # Release any batch slot waiting on this call
+        if call_status in TERMINAL_CALL_STATUSES:
+            resolve_call_completion(call_sid, call_status)
+        
         return {"status": "received"}
     
     except Exception as e:
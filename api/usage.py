@@ -16,10 +16,12 @@ async def get_twilio_usage():
     Get Twilio account balance and usage statistics.
     
     Returns current balance, currency, and call usage for the current month.
+    Lookups are shared with the call orchestrator's balance checks and reused
+    for settings.balance_cache_ttl_seconds.
     """
     try:
         twilio_service = get_twilio_service()
-        usage_data = twilio_service.get_account_balance()
+        usage_data = twilio_service.get_cached_balance()
         return usage_data
     except Exception as e:
         logger.error(f"Error fetching Twilio usage: {e}")
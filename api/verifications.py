@@ -250,11 +250,9 @@ def retry_verification(
 def get_schedule_status(db: Session = Depends(get_db)):
     """Get the status of the automatic calling schedule."""
     try:
-        from models import CallSchedule
+        from models import CallSchedule, CALL_SCHEDULE_ID
         
-        schedule = db.query(CallSchedule).order_by(
-            CallSchedule.created_at.desc()
-        ).first()
+        schedule = db.get(CallSchedule, CALL_SCHEDULE_ID)
         
         if not schedule:
             return ScheduleStatus(
@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./account_verifier.db"
+    db_pool_size: int = 20  # Sized for concurrent webhooks + batch call fan-out
+    db_max_overflow: int = 20
+    db_pool_recycle_seconds: int = 1800
     
     # Twilio - Made optional with defaults for easier testing
     twilio_account_sid: str = ""
@@ -39,13 +42,13 @@ class Settings(BaseSettings):
         """
         try:
             # Try to get runtime override from database
-            from database import get_db
-            db = next(get_db())
+            from database import get_db_context
             from models import SystemSettings
             
-            override = db.query(SystemSettings).filter(
-                SystemSettings.setting_key == "test_mode_override"
-            ).first()
+            with get_db_context() as db:
+                override = db.query(SystemSettings.setting_value).filter(
+                    SystemSettings.setting_key == "test_mode_override"
+                ).first()
             
             if override and override.setting_value:
                 runtime_mode = override.setting_value.lower() in ('true', '1', 'yes')
@@ -62,6 +65,9 @@ class Settings(BaseSettings):
     max_retry_attempts: int = 2
     retry_backoff_minutes: str = "15,120"
     call_timeout_seconds: int = 300
+    balance_cache_ttl_seconds: int = 60  # How long a provider balance lookup is reused
+    min_ai_call_duration: int = 3  # Shorter calls skip AI analysis
+    min_transcript_chars: int = 20  # Shorter transcripts skip AI analysis
     
     # Looping Call Settings
     enable_auto_calling: bool = True
@@ -6,7 +6,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 from config import settings
-from models import Base
+from models import Base, CallSchedule, CALL_SCHEDULE_ID
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,11 +19,14 @@ if settings.database_url.startswith("sqlite"):
         poolclass=StaticPool,
     )
 else:
+    # Webhook handlers and batch workers each hold a short-lived session, so the
+    # pool is sized from settings; pre-ping and recycle weed out stale connections.
     engine = create_engine(
         settings.database_url,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
     )
 
 # Create session factory
@@ -34,6 +37,11 @@ def init_db():
     """Initialize database tables."""
     logger.info("Initializing database tables...")
     Base.metadata.create_all(bind=engine)
+    
+    # Seed the singleton schedule row so lookups are a primary-key get
+    with get_db_context() as db:
+        if db.get(CallSchedule, CALL_SCHEDULE_ID) is None:
+            db.add(CallSchedule(id=CALL_SCHEDULE_ID))
     logger.info("Database tables created successfully")
 
 
@@ -1,8 +1,8 @@
 """
 SQLAlchemy models for the Account Verifier system.
 """
-from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, JSON, Enum as SQLEnum, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, JSON, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import enum
@@ -10,6 +10,11 @@ import enum
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the naive UTC DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class VerificationStatus(str, enum.Enum):
     """Account verification status."""
     PENDING = "pending"
@@ -45,6 +50,10 @@ class AccountVerification(Base):
     """Account verification model."""
     
     __tablename__ = "account_verifications"
+    __table_args__ = (
+        # Supports the retry-eligibility filter used when selecting pending work
+        Index("ix_account_verifications_retry", "status", "last_attempt_at", "attempt_count"),
+    )
     
     # Primary fields
     verification_id = Column(String(255), primary_key=True, index=True)
@@ -74,7 +83,7 @@ class AccountVerification(Base):
     last_attempt_at = Column(DateTime, nullable=True)
     
     # Call metadata
-    call_sid = Column(String(255), nullable=True)
+    call_sid = Column(String(255), nullable=True, index=True)  # Completion lookups are by call_sid
     call_duration_seconds = Column(Integer, nullable=True)
     
     # Results
@@ -153,8 +162,12 @@ class BatchStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+# The calling schedule is a single row, updated in place
+CALL_SCHEDULE_ID = 1
+
+
 class CallSchedule(Base):
-    """Track the automatic calling schedule."""
+    """Track the automatic calling schedule (singleton row CALL_SCHEDULE_ID)."""
     
     __tablename__ = "call_schedules"
     
@@ -6,8 +6,10 @@ from typing import Optional
 from datetime import datetime
 import asyncio
 import structlog
+from config import settings
 from models import AccountVerification, VerificationStatus
-from services.call_orchestrator import CallOrchestrator
+from services.call_orchestrator import CallOrchestrator, CircuitOpenError, InsufficientBalanceError
+from services.twilio_service import get_twilio_service
 from services.verification_service import VerificationService
 
 logger = structlog.get_logger()
@@ -19,10 +21,16 @@ class AutoVerificationQueue:
     Hangs up immediately when account is verified, then moves to next.
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        orchestrator: Optional[CallOrchestrator] = None,
+        verification_service: Optional[VerificationService] = None
+    ):
         self.db = db
-        self.orchestrator = CallOrchestrator(db)
-        self.verification_service = VerificationService(db)
+        self.orchestrator = orchestrator or CallOrchestrator(db)
+        # Share the orchestrator's service rather than building a second one per queue
+        self.verification_service = verification_service or self.orchestrator.verification_service
         self.is_running = False
         self.current_call_sid: Optional[str] = None
         self.current_verification_id: Optional[str] = None
@@ -38,6 +46,9 @@ class AutoVerificationQueue:
             logger.warning("Queue processor already running")
             return
         
+        webhook_base = settings.twilio_webhook_base_url
+        status_failed = VerificationStatus.FAILED
+        
         self.is_running = True
         processed = 0
         successful = 0
@@ -47,8 +58,8 @@ class AutoVerificationQueue:
             logger.info("🚀 Starting automatic verification queue")
             
             while True:
-                # Get next pending verification
-                pending = self.verification_service.get_pending_verifications(limit=1)
+                # Get next pending verification that is due for a call (retry window checked in SQL)
+                pending = self.verification_service.get_pending_verifications(limit=1, ready_to_retry=True)
                 
                 if not pending:
                     logger.info("✅ No more pending verifications")
@@ -64,17 +75,11 @@ class AutoVerificationQueue:
                 try:
                     logger.info(f"📞 Processing verification {verification.verification_id}")
                     
-                    # Check if should retry
-                    should_retry, wait_minutes = self.orchestrator.should_retry(verification.verification_id)
-                    if not should_retry:
-                        logger.info(f"⏭️ Skipping {verification.verification_id} - retry wait needed")
-                        continue
-                    
                     # Initiate call
-                    from config import settings
                     call_sid = self.orchestrator.initiate_call(
                         verification.verification_id,
-                        settings.twilio_webhook_base_url
+                        webhook_base,
+                        check_retry=False
                     )
                     
                     self.current_call_sid = call_sid
@@ -90,7 +95,7 @@ class AutoVerificationQueue:
                     if verification.account_exists:
                         logger.info(f"✅ Account verified for {verification.verification_id} - Moving to next")
                         successful += 1
-                    elif verification.status == VerificationStatus.FAILED:
+                    elif verification.status == status_failed:
                         logger.warning(f"❌ Verification failed for {verification.verification_id}")
                         failed += 1
                     else:
@@ -101,6 +106,12 @@ class AutoVerificationQueue:
                     # Small delay before next call
                     await asyncio.sleep(2)
                     
+                except (CircuitOpenError, InsufficientBalanceError) as e:
+                    # Nothing can be dialed until the provider recovers or funds are added, and the
+                    # verification stays pending, so stop here rather than re-selecting it in a loop
+                    logger.warning(f"⏸️ Stopping queue at {verification.verification_id}: {e}")
+                    break
+                
                 except Exception as e:
                     logger.error(f"❌ Error processing {verification.verification_id}: {e}")
                     failed += 1
@@ -128,7 +139,6 @@ class AutoVerificationQueue:
             
             # Optionally hang up current call
             if self.current_call_sid:
-                from services.twilio_service import get_twilio_service
                 twilio_service = get_twilio_service(self.db)
                 try:
                     twilio_service.hangup_call(self.current_call_sid)
@@ -147,7 +157,6 @@ def handle_verification_confirmed(db: Session, call_sid: str, verification_id: s
         call_sid: Current call SID
         verification_id: Verification that was just confirmed
     """
-    from services.twilio_service import get_twilio_service
     from api.call_monitor import call_monitor
     
     logger.info(f"✅ Account verified for {verification_id} - hanging up immediately")
@@ -1,27 +1,191 @@
 """
 Call orchestrator - manages the end-to-end calling workflow with looping support.
 """
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from models import CallLog, CallOutcome, CallSchedule
-from schemas import CallContext
+from models import AccountVerification, CallLog, CallOutcome, CallSchedule, CALL_SCHEDULE_ID, utcnow
+from schemas import CallContext, CallResultSchema
 from services.verification_service import VerificationService
 from services.twilio_service import get_twilio_service
 from services.ai_agent_service import ai_agent_service
 from config import settings
 import logging
 import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Webhook routes served by api/twilio_webhooks.py, relative to the public base URL
+VOICE_WEBHOOK_PATH = "/api/twilio/voice"
+STATUS_CALLBACK_PATH = "/api/twilio/status-callback"
+
+# Provider balance thresholds (account currency): calls are refused at or below the
+# minimum, and a warning is logged below the low-balance mark
+MIN_CALL_BALANCE = 0.0
+MIN_BATCH_BALANCE = 2.0
+LOW_BALANCE_WARNING = 5.0
+
+# Circuit breaker around provider requests: open after this many consecutive
+# failures, then allow a trial request once the reset timeout has passed
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT_SECONDS = 30.0
+
+# Background processing of completed calls (AI analysis + DB updates)
+COMPLETION_WORKERS = 4
+COMPLETION_DEDUPE_SIZE = 1024
+
+
 # Import call monitor for real-time tracking
+@functools.lru_cache(maxsize=1)
 def get_call_monitor():
     """Lazy import to avoid circular dependency."""
     from api.call_monitor import call_monitor
     return call_monitor
 
 
+@functools.lru_cache(maxsize=1)
+def _get_verification_confirmed_handler():
+    """Lazy import: services.auto_verification_queue imports this module."""
+    from services.auto_verification_queue import handle_verification_confirmed
+    return handle_verification_confirmed
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class InsufficientBalanceError(ValueError):
+    """Raised when the provider balance is too low to place calls."""
+
+
+class RetryDeferred(ValueError):
+    """Raised when a verification is still inside its retry backoff window; not a failure."""
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """Whether an error indicates the provider is unhealthy (client errors don't count)."""
+    status = getattr(error, "status", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return True
+
+
+class _CircuitBreaker:
+    """Minimal closed/open/half-open circuit breaker for one provider operation."""
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit open for {self.name}")
+            # Half-open: let this request through; one more failure re-opens the circuit
+            self._opened_at = None
+            self._failures = self.failure_threshold - 1
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    f"⚡ Circuit opened for {self.name} after {self._failures} failures; "
+                    f"retrying in {self.reset_timeout:.0f}s"
+                )
+    
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker."""
+        self.allow()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if _is_provider_failure(e):
+                self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: Dict[Tuple[str, str], _CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def _get_breaker(provider: str, operation: str) -> _CircuitBreaker:
+    """Return the process-wide circuit breaker for a (provider, operation) pair."""
+    key = (provider, operation)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _CircuitBreaker(
+                f"{provider}.{operation}",
+                CIRCUIT_FAILURE_THRESHOLD,
+                CIRCUIT_RESET_TIMEOUT_SECONDS
+            )
+            _breakers[key] = breaker
+        return breaker
+
+
+def _resolve_base_url(webhook_base_url: Optional[str], fallback_base: str) -> str:
+    """Public webhook base URL without a trailing slash, falling back to the configured one."""
+    return (webhook_base_url or fallback_base or "").rstrip("/")
+
+
+# retry_backoff_minutes -> parsed timedeltas, re-parsed only when the setting changes
+_backoff_timedeltas: Tuple[str, Tuple[timedelta, ...]] = ("", ())
+_NO_WAIT = timedelta(0)
+
+
+def _get_backoff_timedeltas() -> Tuple[timedelta, ...]:
+    """Retry backoff intervals from settings.retry_backoff_minutes as timedeltas."""
+    global _backoff_timedeltas
+    raw = settings.retry_backoff_minutes
+    if _backoff_timedeltas[0] != raw:
+        _backoff_timedeltas = (raw, tuple(timedelta(minutes=m) for m in settings.retry_backoff_list))
+    return _backoff_timedeltas[1]
+
+
+def _unanswered_call_result(call_duration: int) -> Tuple[CallResultSchema, str]:
+    """
+    Result for a call too short to be worth sending to the AI.
+    
+    Calls that barely connected are treated as unanswered; longer calls
+    with no real conversation most likely reached a voicemail greeting.
+    """
+    if call_duration < settings.min_ai_call_duration:
+        outcome, summary = CallOutcome.NO_ANSWER, "No answer: call ended before a conversation started"
+    else:
+        outcome, summary = CallOutcome.VOICEMAIL, "No conversation captured (likely voicemail)"
+    
+    return CallResultSchema(
+        account_exists=False,
+        verification_status="pending",
+        agent_notes=summary,
+        call_outcome=outcome,
+        follow_up_needed=False
+    ), summary
+
+
 class CallOrchestrator:
     """Orchestrates the end-to-end calling process for account verifications."""
     
@@ -30,6 +194,58 @@ class CallOrchestrator:
         self.twilio_service = get_twilio_service(db)
         self.verification_service = VerificationService(db)
     
+    @property
+    def _provider_key(self) -> str:
+        """Key for the active telephony backend in the circuit breakers."""
+        return "twilio_mock" if self.twilio_service._service else "twilio"
+    
+    def _fetch_balance(self) -> dict:
+        """Look up the provider account balance through its circuit breaker."""
+        # get_account_balance reports failures as an error dict rather than raising
+        breaker = _get_breaker(self._provider_key, "get_account_balance")
+        breaker.allow()
+        balance_info = self.twilio_service.get_account_balance()
+        if 'error' in balance_info:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return balance_info
+    
+    def _get_cached_balance(self, ttl: Optional[float] = None) -> dict:
+        """Get the provider account balance, reusing a recent lookup when available."""
+        return self.twilio_service.get_cached_balance(ttl, fetch=self._fetch_balance)
+    
+    def _check_balance(self, hard_min: float, warn: float) -> tuple[bool, str]:
+        """
+        Check the provider balance against a hard minimum and a warning threshold.
+        
+        Lookup failures don't block calls (might be trial account limitations).
+        
+        Returns:
+            Tuple of (ok, message); ok is False when the balance is at or below hard_min
+        """
+        try:
+            balance_info = self._get_cached_balance()
+            if 'error' in balance_info:
+                raise RuntimeError(balance_info['error'])
+            balance = float(balance_info.get('balance', 0))
+            currency = balance_info.get('currency', 'USD')
+        except Exception as e:
+            message = f"Could not check Twilio balance (continuing anyway): {e}"
+            logger.warning(message)
+            return True, message
+        
+        if balance <= hard_min:
+            return False, f"Insufficient Twilio balance ({currency} {balance:.2f})"
+        if balance < warn:
+            message = f"⚠️ LOW BALANCE WARNING: Twilio account balance is {currency} {balance:.2f}"
+            logger.warning(message)
+            return True, message
+        
+        message = f"✓ Twilio balance check: {currency} {balance:.2f}"
+        logger.info(message)
+        return True, message
+    
     def should_retry(self, verification_id: str) -> tuple[bool, Optional[int]]:
         """
         Determine if a verification should be retried.
@@ -48,115 +264,214 @@ class CallOrchestrator:
         
         # Check if enough time has passed since last attempt
         if verification.last_attempt_at:
-            backoff_list = settings.retry_backoff_list
-            attempt_index = min(verification.attempt_count - 1, len(backoff_list) - 1)
-            wait_minutes = backoff_list[attempt_index]
+            backoffs = _get_backoff_timedeltas()
+            attempt_index = min(verification.attempt_count - 1, len(backoffs) - 1)
             
-            next_attempt_time = verification.last_attempt_at + timedelta(minutes=wait_minutes)
-            if datetime.utcnow() < next_attempt_time:
-                remaining_minutes = int((next_attempt_time - datetime.utcnow()).total_seconds() / 60)
+            remaining = verification.last_attempt_at + backoffs[attempt_index] - utcnow()
+            if remaining > _NO_WAIT:
+                remaining_minutes = int(remaining.total_seconds() // 60)
                 logger.info(f"Verification {verification_id} needs to wait {remaining_minutes} more minutes")
                 return False, remaining_minutes
         
         return True, 0
     
-    def initiate_call(self, verification_id: str, webhook_base_url: str) -> str:
+    def _require_call_balance(self):
         """
-        Initiate an outbound call for a verification.
+        Raise InsufficientBalanceError if the balance is too low to place a call.
+        
+        Touches no database state, so it is safe to run in a worker thread.
+        """
+        balance_ok, message = self._check_balance(MIN_CALL_BALANCE, LOW_BALANCE_WARNING)
+        if not balance_ok:
+            raise InsufficientBalanceError(f"{message}. Please add funds to your account.")
+    
+    def _prepare_call(self, verification_id: str, check_retry: bool = True, check_balance: bool = True):
+        """
+        Run the pre-call checks (existence, balance, retry window) for a verification.
         
         Args:
             verification_id: The verification to call
-            webhook_base_url: Base URL for webhooks
+            check_retry: Skip the retry-window check when the caller already selected
+                the verification with get_pending_verifications(ready_to_retry=True)
+            check_balance: Skip the balance check when the caller already ran
+                _require_call_balance
         
         Returns:
-            call_sid: Twilio Call SID
+            The AccountVerification to call
         """
         verification = self.verification_service.get_verification(verification_id)
         if not verification:
             raise ValueError(f"Verification {verification_id} not found")
         
         # Check Twilio account balance before making call
-        try:
-            balance_info = twilio_service.get_account_balance()
-            if 'error' not in balance_info:
-                balance = float(balance_info.get('balance', 0))
-                currency = balance_info.get('currency', 'USD')
-                
-                # Warn if balance is low (less than $5)
-                if balance < 5.0:
-                    logger.warning(f"⚠️ LOW BALANCE WARNING: Twilio account balance is {currency} {balance:.2f}")
-                    if balance <= 0:
-                        raise ValueError(f"Insufficient Twilio balance ({currency} {balance:.2f}). Please add funds to your account.")
-                else:
-                    logger.info(f"✓ Twilio balance check: {currency} {balance:.2f}")
-        except ValueError:
-            # Re-raise insufficient balance errors
-            raise
-        except Exception as e:
-            # Log balance check errors but don't block calls (might be trial account limitations)
-            logger.warning(f"Could not check Twilio balance (continuing anyway): {e}")
+        if check_balance:
+            self._require_call_balance()
         
         # Check if we should retry
-        should_retry, wait_minutes = self.should_retry(verification_id)
-        if not should_retry:
-            if wait_minutes:
-                raise ValueError(f"Must wait {wait_minutes} more minutes before retry")
-            else:
-                raise ValueError(f"Verification {verification_id} has exceeded max retry attempts")
+        if check_retry:
+            should_retry, wait_minutes = self.should_retry(verification_id)
+            if not should_retry:
+                if wait_minutes is not None:
+                    raise RetryDeferred(f"Must wait {wait_minutes} more minutes before retry")
+                else:
+                    raise ValueError(f"Verification {verification_id} has exceeded max retry attempts")
         
-        # Build webhook URLs
-        voice_webhook_url = f"{webhook_base_url}/api/twilio/voice?verification_id={verification_id}"
-        status_callback_url = f"{webhook_base_url}/api/twilio/status-callback"
+        return verification
+    
+    def _dial(
+        self,
+        verification_id: str,
+        to_number: str,
+        company_name: str,
+        webhook_base_url: str,
+        status_callback_url: Optional[str] = None
+    ) -> str:
+        """
+        Place the outbound call with the telephony provider.
+        
+        Touches no database state, so it is safe to run in a worker thread.
+        status_callback_url may be prebuilt by callers placing many calls.
+        """
+        # Build webhook URLs (verification_id is query-encoded)
+        voice_webhook_url = f"{webhook_base_url}{VOICE_WEBHOOK_PATH}?{urlencode({'verification_id': verification_id})}"
+        if status_callback_url is None:
+            status_callback_url = webhook_base_url + STATUS_CALLBACK_PATH
+        
+        # Start call monitoring
+        monitor = get_call_monitor()
+        
+        # Initiate the call via Twilio
+        logger.info(f"🔄 Initiating call for verification {verification_id}")
+        monitor.add_event(verification_id, "preparation", "Preparing to make call", {
+            "to_number": to_number,
+            "company": company_name
+        })
+        
+        breaker = _get_breaker(self._provider_key, "make_outbound_call")
+        return breaker.call(
+            self.twilio_service.make_outbound_call,
+            to_number=to_number,
+            verification_id=verification_id,
+            webhook_url=voice_webhook_url,
+            status_callback_url=status_callback_url
+        )
+    
+    def _record_call(
+        self,
+        verification_id: str,
+        to_number: str,
+        call_sid: str
+    ):
+        """
+        Register the placed call with the monitor and persist its state.
+        
+        The verification update and call log are committed in one transaction.
+        """
+        monitor = get_call_monitor()
+        
+        # Register call with monitor
+        monitor.start_call(call_sid, verification_id, to_number)
+        monitor.add_event(call_sid, "call_initiated", f"Call initiated to {to_number}", {
+            "call_sid": call_sid,
+            "verification_id": verification_id
+        })
+        
+        # Update verification status
+        verification = self.verification_service.mark_as_calling(verification_id, call_sid, commit=False)
+        
+        # Create call log entry
+        self.db.add(CallLog(
+            verification_id=verification_id,
+            call_sid=call_sid,
+            direction="outbound",
+            from_number=settings.twilio_phone_number,
+            to_number=to_number,
+            call_status="initiated",
+            attempt_number=verification.attempt_count,
+            initiated_at=utcnow()
+        ))
+        self.db.commit()
+        
+        monitor.add_event(call_sid, "database_updated", "Call log created in database")
+        logger.info(f"✅ Initiated call {call_sid} for verification {verification_id}")
+    
+    def _handle_initiate_failure(self, verification_id: str, error: Exception):
+        """Record a failed call initiation."""
+        logger.error(f"Failed to initiate call for verification {verification_id}: {error}")
+        # Force a fresh balance check next time in case the failure was balance related
+        self.twilio_service.invalidate_cached_balance()
+        self.verification_service.mark_as_failed(verification_id, str(error))
+    
+    def initiate_call(
+        self,
+        verification_id: str,
+        webhook_base_url: str,
+        check_retry: bool = True
+    ) -> str:
+        """
+        Initiate an outbound call for a verification.
+        
+        Args:
+            verification_id: The verification to call
+            webhook_base_url: Base URL for webhooks
+            check_retry: Skip the retry-window check when the verification was
+                selected with get_pending_verifications(ready_to_retry=True)
+        
+        Returns:
+            call_sid: Twilio Call SID
+        """
+        verification = self._prepare_call(verification_id, check_retry=check_retry)
+        to_number = verification.company_phone
+        webhook_base_url = _resolve_base_url(webhook_base_url, settings.twilio_webhook_base_url)
         
         try:
-            # Start call monitoring
-            monitor = get_call_monitor()
-            
-            # Initiate the call via Twilio
-            logger.info(f"🔄 Initiating call for verification {verification_id}")
-            monitor.add_event(verification_id, "preparation", "Preparing to make call", {
-                "to_number": verification.company_phone,
-                "company": verification.company_name
-            })
-            
-            call_sid = self.twilio_service.make_outbound_call(
-                to_number=verification.company_phone,
-                verification_id=verification_id,
-                webhook_url=voice_webhook_url,
-                status_callback_url=status_callback_url
-            )
-            
-            # Register call with monitor
-            monitor.start_call(call_sid, verification_id, verification.company_phone)
-            monitor.add_event(call_sid, "call_initiated", f"Call initiated to {verification.company_phone}", {
-                "call_sid": call_sid,
-                "verification_id": verification_id
-            })
-            
-            # Update verification status
-            self.verification_service.mark_as_calling(verification_id, call_sid)
+            call_sid = self._dial(verification_id, to_number, verification.company_name, webhook_base_url)
+            self._record_call(verification_id, to_number, call_sid)
+            return call_sid
             
-            # Create call log entry
-            call_log = CallLog(
-                verification_id=verification_id,
-                call_sid=call_sid,
-                direction="outbound",
-                from_number=settings.twilio_phone_number,
-                to_number=verification.company_phone,
-                call_status="initiated",
-                attempt_number=verification.attempt_count,
-                initiated_at=datetime.utcnow()
+        except CircuitOpenError:
+            # Provider is known to be down: leave the verification pending for a later run
+            logger.warning(f"⏸️ Deferred verification {verification_id}: telephony provider circuit is open")
+            raise
+        except Exception as e:
+            self._handle_initiate_failure(verification_id, e)
+            raise
+    
+    async def initiate_call_async(
+        self,
+        verification_id: str,
+        webhook_base_url: str,
+        check_retry: bool = True,
+        status_callback_url: Optional[str] = None
+    ) -> str:
+        """
+        Async variant of initiate_call for use on the event loop.
+        
+        The blocking provider requests (balance lookup and call creation) run in
+        a worker thread; the Session is not thread-safe, so all database work
+        stays on the loop. status_callback_url is built from webhook_base_url
+        when not given.
+        """
+        # The balance lookup is cached, but a miss costs several provider round-trips
+        await asyncio.to_thread(self._require_call_balance)
+        verification = self._prepare_call(verification_id, check_retry=check_retry, check_balance=False)
+        to_number = verification.company_phone
+        webhook_base_url = _resolve_base_url(webhook_base_url, settings.twilio_webhook_base_url)
+        
+        try:
+            call_sid = await asyncio.to_thread(
+                self._dial, verification_id, to_number, verification.company_name,
+                webhook_base_url, status_callback_url
             )
-            self.db.add(call_log)
-            self.db.commit()
-            
-            monitor.add_event(call_sid, "database_updated", "Call log created in database")
-            logger.info(f"✅ Initiated call {call_sid} for verification {verification_id}")
+            self._record_call(verification_id, to_number, call_sid)
             return call_sid
             
+        except CircuitOpenError:
+            # Provider is known to be down: leave the verification pending for a later run
+            logger.warning(f"⏸️ Deferred verification {verification_id}: telephony provider circuit is open")
+            raise
         except Exception as e:
-            logger.error(f"Failed to initiate call for verification {verification_id}: {e}")
-            self.verification_service.mark_as_failed(verification_id, str(e))
+            self._handle_initiate_failure(verification_id, e)
             raise
     
     def handle_call_completed(
@@ -175,15 +490,14 @@ class CallOrchestrator:
             call_duration: Duration in seconds
             recording_consent_given: Whether user consented to recording
         """
-        from models import AccountVerification
-        
-        # Find the verification by call_sid
+        # Find the verification by call_sid; the call log is updated in place below without loading it
         verification = self.db.query(AccountVerification).filter(
             AccountVerification.call_sid == call_sid
         ).first()
         
         if not verification:
             logger.error(f"No verification found for call_sid {call_sid}")
+            resolve_call_completion(call_sid, None)
             return
         
         try:
@@ -191,26 +505,36 @@ class CallOrchestrator:
             monitor = get_call_monitor()
             monitor.add_event(call_sid, "processing_started", "Processing call results")
             
-            # Create call context
-            call_context = CallContext(
-                verification_id=verification.verification_id,
-                customer_name=verification.customer_name,
-                customer_phone=verification.customer_phone,
-                company_name=verification.company_name,
-                company_phone=verification.company_phone,
-                customer_email=verification.customer_email,
-                account_number=verification.account_number,
-                verification_instruction=verification.verification_instruction,
-                attempt_number=verification.attempt_count
+            # Skip the AI for calls that never produced a usable conversation
+            meaningful = (
+                call_duration >= settings.min_ai_call_duration
+                and len((conversation_transcript or "").strip()) >= settings.min_transcript_chars
             )
             
-            monitor.add_event(call_sid, "ai_processing", "AI analyzing conversation")
-            
-            # Process the conversation with AI
-            result, summary = ai_agent_service.process_conversation(
-                call_context,
-                conversation_transcript
-            )
+            if meaningful:
+                # Create call context
+                call_context = CallContext(
+                    verification_id=verification.verification_id,
+                    customer_name=verification.customer_name,
+                    customer_phone=verification.customer_phone,
+                    company_name=verification.company_name,
+                    company_phone=verification.company_phone,
+                    customer_email=verification.customer_email,
+                    account_number=verification.account_number,
+                    verification_instruction=verification.verification_instruction,
+                    attempt_number=verification.attempt_count
+                )
+                
+                monitor.add_event(call_sid, "ai_processing", "AI analyzing conversation")
+                
+                # Process the conversation with AI
+                result, summary = ai_agent_service.process_conversation(
+                    call_context,
+                    conversation_transcript
+                )
+            else:
+                logger.info(f"Skipping AI analysis for call {call_sid}: {call_duration}s, no meaningful transcript")
+                result, summary = _unanswered_call_result(call_duration)
             
             monitor.add_event(call_sid, "ai_result", f"AI decision: {result.call_outcome}", {
                 "outcome": result.call_outcome.value,
@@ -219,123 +543,285 @@ class CallOrchestrator:
             })
             
             # If account is verified, hang up immediately and move to next
-            if result.account_exists and result.call_outcome == CallOutcome.VERIFIED:
+            if result.call_outcome is CallOutcome.ACCOUNT_FOUND and result.account_exists:
                 logger.info(f"✅ Account verified for {verification.verification_id} - ending call immediately")
                 monitor.add_event(call_sid, "auto_hangup", "Account verified - terminating call to save time")
                 
-                from services.auto_verification_queue import handle_verification_confirmed
-                handle_verification_confirmed(self.db, call_sid, verification.verification_id)
+                _get_verification_confirmed_handler()(self.db, call_sid, verification.verification_id)
             
             # Determine if we should store transcript
             transcript_to_store = None
             if settings.enable_transcription and recording_consent_given:
                 transcript_to_store = conversation_transcript
             
-            # Update verification with results
+            # Update verification with results (committed together with the call log below)
             self.verification_service.update_call_result(
                 verification_id=verification.verification_id,
                 result=result,
                 call_summary=summary,
                 transcript=transcript_to_store,
-                call_duration=call_duration
+                call_duration=call_duration,
+                commit=False
             )
             
-            # Update call log
-            call_log = self.db.query(CallLog).filter(
-                CallLog.call_sid == call_sid
-            ).order_by(CallLog.created_at.desc()).first()
+            # Update call log in the same transaction
+            self.db.execute(
+                update(CallLog)
+                .where(CallLog.call_sid == call_sid)
+                .values(
+                    completed_at=utcnow(),
+                    duration_seconds=call_duration,
+                    call_outcome=result.call_outcome,
+                    call_status="completed"
+                )
+            )
             
-            if call_log:
-                call_log.completed_at = datetime.utcnow()
-                call_log.duration_seconds = call_duration
-                call_log.call_outcome = result.call_outcome
-                call_log.call_status = "completed"
-                self.db.commit()
+            self.db.commit()
             
             logger.info(f"Completed call {call_sid} for verification {verification.verification_id}: {result.call_outcome}")
+            resolve_call_completion(call_sid, result.call_outcome.value)
             
         except Exception as e:
             logger.error(f"Error handling completed call {call_sid}: {e}", exc_info=True)
             self.verification_service.mark_as_failed(verification.verification_id, str(e))
+            resolve_call_completion(call_sid, None)
     
     async def process_batch(self, max_verifications: Optional[int] = None):
         """
-        Process a batch of pending verifications sequentially.
+        Process a batch of pending verifications, placing up to
+        max_concurrent_calls calls at a time.
         
         Args:
             max_verifications: Maximum number of verifications to process
         """
-        # Check Twilio balance before processing batch
-        try:
-            balance_info = twilio_service.get_account_balance()
-            if 'error' not in balance_info:
-                balance = float(balance_info.get('balance', 0))
-                currency = balance_info.get('currency', 'USD')
-                logger.info(f"📊 Starting batch with Twilio balance: {currency} {balance:.2f}")
-                
-                if balance < 2.0:
-                    logger.error(f"⚠️ Batch processing cancelled: Insufficient balance ({currency} {balance:.2f})")
-                    return 0, 0, 0
-                elif balance < 5.0:
-                    logger.warning(f"⚠️ LOW BALANCE: {currency} {balance:.2f} - Consider adding funds soon")
-        except Exception as e:
-            logger.warning(f"Could not check balance before batch (continuing anyway): {e}")
+        # Check Twilio balance before processing batch (off the event loop: it's a blocking HTTP call).
+        # The lookup is cached; per-call checks that miss the cache also run in a thread.
+        balance_ok, message = await asyncio.to_thread(
+            self._check_balance, MIN_BATCH_BALANCE, LOW_BALANCE_WARNING
+        )
+        if not balance_ok:
+            logger.error(f"⚠️ Batch processing cancelled: {message}")
+            return 0, 0, 0
         
-        pending_verifications = self.verification_service.get_pending_verifications(
+        # Retry eligibility (attempt count and backoff window) is filtered in SQL, and the
+        # rows are claimed so concurrent batch processors don't pick the same verifications
+        verification_ids, company_phones = self.verification_service.claim_pending_batch(
             limit=max_verifications
         )
         
-        logger.info(f"Starting batch processing of {len(pending_verifications)} verifications")
+        logger.info(f"Starting batch processing of {len(verification_ids)} verifications")
+        
+        webhook_base_url = _resolve_base_url(None, settings.twilio_webhook_base_url)
+        status_callback_url = webhook_base_url + STATUS_CALLBACK_PATH
+        circuit_open = False
+        
+        async def _run_one(i: int) -> str:
+            nonlocal circuit_open
+            verification_id = verification_ids[i]
+            # Workers take claims in order, so claims from i on are not dialed yet; renewing
+            # them keeps another process from releasing them as abandoned while this call runs
+            self.verification_service.renew_claims(verification_ids[i:])
+            try:
+                # Each call is committed as soon as it is recorded: completion is handled in
+                # another session, which must see the call before its completion arrives
+                call_sid = await self.initiate_call_async(
+                    verification_id, webhook_base_url, check_retry=False,
+                    status_callback_url=status_callback_url
+                )
+            except CircuitOpenError:
+                circuit_open = True
+                raise
+            completion = register_call_completion(call_sid)
+            logger.info(f"Initiated call {call_sid} to {company_phones[i]} for verification {verification_id}")
+            
+            # Keep the worker busy until the call finishes so max_concurrent_calls bounds live calls
+            try:
+                await asyncio.wait_for(completion, timeout=settings.call_timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"No completion for call {call_sid} after {settings.call_timeout_seconds}s")
+            finally:
+                discard_call_completion(call_sid)
+            return call_sid
+        
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for i in range(len(verification_ids)):
+            queue.put_nowait(i)
+        results: List[object] = [None] * len(verification_ids)
+        
+        async def _worker():
+            # Once the provider circuit opens, the rest of the batch is left pending
+            while not circuit_open:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[i] = await _run_one(i)
+                except Exception as e:
+                    results[i] = e
+        
+        # Each worker moves on when its call completes (webhook, status callback or mock
+        # completion resolves the call's future) rather than after a fixed sleep.
+        worker_count = min(max(1, settings.max_concurrent_calls), len(verification_ids))
+        try:
+            async with asyncio.TaskGroup() as workers:
+                for _ in range(worker_count):
+                    workers.create_task(_worker())
+        finally:
+            # Claims that never turned into a call (skipped, deferred, failed pre-call checks)
+            # go back to pending; calls that failed to dial were already marked failed
+            self.verification_service.release_claims([
+                verification_id for verification_id, result in zip(verification_ids, results)
+                if not isinstance(result, str)
+            ])
         
         processed = 0
         successful = 0
         failed = 0
-        
-        for verification in pending_verifications:
-            try:
-                # Check if we should retry this verification
-                should_retry, wait_minutes = self.should_retry(verification.verification_id)
-                if not should_retry:
-                    continue
-                
-                # Initiate the call
-                webhook_base_url = settings.twilio_webhook_base_url
-                call_sid = self.initiate_call(verification.verification_id, webhook_base_url)
-                
-                logger.info(f"Initiated call {call_sid} for verification {verification.verification_id}")
+        for verification_id, result in zip(verification_ids, results):
+            # Deferred work stays pending for a later run and isn't a failure
+            if isinstance(result, CircuitOpenError):
+                continue
+            if isinstance(result, Exception):
+                logger.error(f"Error processing verification {verification_id}: {result}")
+                failed += 1
+            elif result:
                 processed += 1
                 successful += 1
-                
-                # Wait for call to complete (in production, this would be async via webhooks)
-                await asyncio.sleep(5)
-                
-            except Exception as e:
-                logger.error(f"Error processing verification {verification.verification_id}: {e}")
-                failed += 1
-                continue
         
         logger.info(f"Batch processing completed: {processed} processed, {successful} successful, {failed} failed")
         return processed, successful, failed
     
     def update_schedule(self, processed: int, successful: int, failed: int):
         """Update the call schedule tracking."""
-        schedule = self.db.query(CallSchedule).order_by(
-            CallSchedule.created_at.desc()
-        ).first()
+        now = utcnow()
+        next_run_at = now + timedelta(minutes=settings.call_loop_interval_minutes)
         
-        if not schedule:
-            schedule = CallSchedule()
-            self.db.add(schedule)
+        # Counters are incremented server-side in one statement, so concurrent runs can't lose updates
+        result = self.db.execute(
+            update(CallSchedule)
+            .where(CallSchedule.id == CALL_SCHEDULE_ID)
+            .values(
+                last_run_at=now,
+                next_run_at=next_run_at,
+                verifications_processed=CallSchedule.verifications_processed + processed,
+                verifications_successful=CallSchedule.verifications_successful + successful,
+                verifications_failed=CallSchedule.verifications_failed + failed,
+                is_running=False
+            )
+        )
         
-        schedule.last_run_at = datetime.utcnow()
-        schedule.next_run_at = datetime.utcnow() + timedelta(minutes=settings.call_loop_interval_minutes)
-        schedule.verifications_processed += processed
-        schedule.verifications_successful += successful
-        schedule.verifications_failed += failed
-        schedule.is_running = False
+        if result.rowcount == 0:
+            self.db.add(CallSchedule(
+                id=CALL_SCHEDULE_ID,
+                last_run_at=now,
+                next_run_at=next_run_at,
+                verifications_processed=processed,
+                verifications_successful=successful,
+                verifications_failed=failed,
+                is_running=False
+            ))
         
         self.db.commit()
-        logger.info(f"Updated schedule: next run at {schedule.next_run_at}")
+        logger.info(f"Updated schedule: next run at {next_run_at}")
 
 
-from models import AccountVerification
+_completion_executor = ThreadPoolExecutor(max_workers=COMPLETION_WORKERS, thread_name_prefix="call-completion")
+_completion_lock = threading.Lock()
+# call_sids already queued, oldest first; used to drop duplicate provider callbacks
+_queued_completions: "OrderedDict[str, None]" = OrderedDict()
+
+
+# call_sid -> (loop, future) for batch calls waiting on their completion
+_completion_waiters: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+
+def register_call_completion(call_sid: str) -> asyncio.Future:
+    """Create a future, resolved by resolve_call_completion, for a placed call. Call on the event loop."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    with _completion_lock:
+        _completion_waiters[call_sid] = (loop, future)
+    return future
+
+
+def discard_call_completion(call_sid: str):
+    """Stop waiting for a call's completion."""
+    with _completion_lock:
+        _completion_waiters.pop(call_sid, None)
+
+
+def resolve_call_completion(call_sid: str, outcome: Optional[str]):
+    """
+    Wake up whoever is waiting for this call to finish. Safe to call from any thread.
+    
+    Args:
+        call_sid: Twilio Call SID
+        outcome: Call outcome or final call status, None if processing failed
+    """
+    with _completion_lock:
+        waiter = _completion_waiters.pop(call_sid, None)
+    if waiter is None:
+        return
+    
+    loop, future = waiter
+    
+    def _set_result():
+        if not future.done():
+            future.set_result(outcome)
+    
+    loop.call_soon_threadsafe(_set_result)
+
+
+def enqueue_call_completed(
+    call_sid: str,
+    conversation_transcript: str,
+    call_duration: int,
+    recording_consent_given: bool = False
+) -> bool:
+    """
+    Queue a completed call for background processing and return immediately.
+    
+    The call_sid is the idempotency key: repeated deliveries for a call that
+    is already queued or recently processed are ignored.
+    
+    Returns:
+        True if the call was queued, False if it was a duplicate
+    """
+    with _completion_lock:
+        if call_sid in _queued_completions:
+            logger.info(f"Ignoring duplicate completion for call {call_sid}")
+            return False
+        _queued_completions[call_sid] = None
+        if len(_queued_completions) > COMPLETION_DEDUPE_SIZE:
+            _queued_completions.popitem(last=False)
+    
+    _completion_executor.submit(
+        _process_call_completed,
+        call_sid,
+        conversation_transcript,
+        call_duration,
+        recording_consent_given
+    )
+    return True
+
+
+def _process_call_completed(
+    call_sid: str,
+    conversation_transcript: str,
+    call_duration: int,
+    recording_consent_given: bool
+):
+    """Worker body for enqueue_call_completed; runs with its own session."""
+    from database import get_db_context
+    
+    try:
+        with get_db_context() as db:
+            CallOrchestrator(db).handle_call_completed(
+                call_sid=call_sid,
+                conversation_transcript=conversation_transcript,
+                call_duration=call_duration,
+                recording_consent_given=recording_consent_given
+            )
+    except Exception as e:
+        logger.error(f"Background processing failed for call {call_sid}: {e}", exc_info=True)
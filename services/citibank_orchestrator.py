@@ -5,7 +5,6 @@ Handles batch processing and record rotation logic.
 from sqlalchemy.orm import Session
 from models import CustomerRecord, AccountStatus, SystemSettings
 from services.citibank_agent_service import citibank_agent
-from services.twilio_service import twilio_service
 from datetime import datetime
 from typing import Optional, List
 import logging
@@ -1,13 +1,63 @@
 """
 Mock service for testing mode - simulates Twilio and OpenAI calls without using real APIs
 """
+import asyncio
+import functools
 import logging
 import random
-import time
+import threading
+import uuid
+from datetime import datetime
 from typing import Optional
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Event loop (on one daemon thread) that times mock completions scheduled off the main loop
+_timer_loop: Optional[asyncio.AbstractEventLoop] = None
+_timer_loop_lock = threading.Lock()
+
+
+def _get_timer_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared timer loop, starting it on first use."""
+    global _timer_loop
+    with _timer_loop_lock:
+        if _timer_loop is None:
+            _timer_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_timer_loop.run_forever,
+                name="mock-call-timer",
+                daemon=True
+            ).start()
+        return _timer_loop
+
+
+@functools.lru_cache(maxsize=1)
+def _twilio_client(account_sid: str, auth_token: str):
+    """Shared Twilio REST client (and its HTTP session) for the given credentials."""
+    from twilio.rest import Client
+    return Client(account_sid, auth_token)
+
+
+# Account SIDs whose balance API is unavailable (trial accounts); kept at module level
+# because MockTwilioService instances are rebuilt whenever the Twilio service is
+_trial_balance_accounts: set = set()
+
+
+# Canned conversations used as mock call transcripts
+_MOCK_TRANSCRIPTS: tuple = (
+    "[Agent]: Hello, this is the automated verification system calling about account verification.\n[Representative]: Yes, hello. How can I help you?\n[Agent]: I'm calling to verify an account. Could you confirm if you have an account for the customer?\n[Representative]: Let me check... Yes, I can confirm we have that account on file.\n[Agent]: Thank you for confirming. The account has been verified.\n[Representative]: You're welcome. Have a good day.",
+    
+    "[Agent]: Hello, this is an automated call regarding account verification.\n[Representative]: Hi there.\n[Agent]: I need to verify if an account exists in your system.\n[Representative]: I've checked our records and I don't see that account.\n[Agent]: Understood. Thank you for checking.\n[Representative]: No problem.",
+    
+    "[Agent]: Good day, I'm calling about an account verification.\n[Representative]: Hello. What do you need?\n[Agent]: Can you verify if you have an account on file?\n[Representative]: This is a complex situation. You might need to speak with a supervisor.\n[Agent]: I understand. This will require human review.\n[Representative]: Yes, please have someone call back."
+)
+
+# Fixed TwiML returned by the mock
+_STREAM_TWIML_PREFIX = '<?xml version="1.0" encoding="UTF-8"?><Response><Connect><Stream url="'
+_STREAM_TWIML_SUFFIX = '"/></Connect></Response>'
+_VOICEMAIL_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response><Hangup/></Response>'
+
 
 class MockTwilioService:
     """Mock Twilio service for testing mode."""
@@ -27,13 +77,12 @@ class MockTwilioService:
         Simulate an outbound call without actually calling Twilio.
         In test mode, always calls the registered test number for Twilio trial account compliance.
         """
-        from config import settings
         # In test mode, override the number to always call the verified test number
         test_number = settings.test_phone_number
         actual_to_number = test_number
         
-        # Generate a fake call SID
-        call_sid = f"CA_MOCK_{int(time.time())}_{random.randint(1000, 9999)}"
+        # Generate a fake call SID (random, so bursts of mock calls can't collide)
+        call_sid = f"CA_MOCK_{uuid.uuid4().hex[:16]}"
         
         logger.info(f"🧪 MOCK CALL: Original target: {to_number}, Calling test number: {actual_to_number}")
         logger.info(f"🧪 Mock Call SID: {call_sid}")
@@ -48,64 +97,59 @@ class MockTwilioService:
         return call_sid
     
     def _schedule_mock_completion(self, call_sid: str, verification_id: str):
-        """Schedule a background task to simulate call completion."""
-        import threading
+        """
+        Schedule simulated call completion after a random 3-8 second delay.
+        
+        Uses a loop timer rather than a sleeping thread per call: the running
+        loop when there is one, otherwise the shared timer loop (calls are
+        usually placed from worker threads).
+        """
+        delay = random.randint(3, 8)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = _get_timer_loop()
+            loop.call_soon_threadsafe(loop.call_later, delay, self._complete_mock_call, call_sid, verification_id)
+        else:
+            loop.call_later(delay, self._complete_mock_call, call_sid, verification_id)
+    
+    def _complete_mock_call(self, call_sid: str, verification_id: str):
+        """Simulate call completion."""
+        logger.info(f"🧪 MOCK: Simulating completion for call {call_sid}")
         
-        def simulate_call():
-            """Simulate call completion after a delay."""
-            time.sleep(random.randint(3, 8))  # Random delay 3-8 seconds
+        # Hand the completion to the background processor, as a status webhook would
+        try:
+            from services.call_orchestrator import enqueue_call_completed
             
-            logger.info(f"🧪 MOCK: Simulating completion for call {call_sid}")
+            # Generate a mock transcript
+            mock_transcript = self._generate_mock_transcript(verification_id)
+            mock_duration = random.randint(30, 120)
             
-            # Trigger the completion handler
-            try:
-                from database import get_db
-                from services.call_orchestrator import CallOrchestrator
-                
-                db = next(get_db())
-                orchestrator = CallOrchestrator(db)
-                
-                # Generate a mock transcript
-                mock_transcript = self._generate_mock_transcript(verification_id)
-                mock_duration = random.randint(30, 120)
-                
-                orchestrator.handle_call_completed(
-                    call_sid=call_sid,
-                    conversation_transcript=mock_transcript,
-                    call_duration=mock_duration,
-                    recording_consent_given=True
-                )
-                
-                logger.info(f"🧪 MOCK: Completed call {call_sid} successfully")
-                
-            except Exception as e:
-                logger.error(f"🧪 MOCK: Error completing call {call_sid}: {e}", exc_info=True)
-        
-        # Start background thread
-        thread = threading.Thread(target=simulate_call, daemon=True)
-        thread.start()
+            enqueue_call_completed(
+                call_sid=call_sid,
+                conversation_transcript=mock_transcript,
+                call_duration=mock_duration,
+                recording_consent_given=True
+            )
+            
+            logger.info(f"🧪 MOCK: Queued completion for call {call_sid}")
+            
+        except Exception as e:
+            logger.error(f"🧪 MOCK: Error completing call {call_sid}: {e}", exc_info=True)
     
     def _generate_mock_transcript(self, verification_id: str) -> str:
         """Generate a mock conversation transcript."""
-        templates = [
-            f"[Agent]: Hello, this is the automated verification system calling about account verification.\n[Representative]: Yes, hello. How can I help you?\n[Agent]: I'm calling to verify an account. Could you confirm if you have an account for the customer?\n[Representative]: Let me check... Yes, I can confirm we have that account on file.\n[Agent]: Thank you for confirming. The account has been verified.\n[Representative]: You're welcome. Have a good day.",
-            
-            f"[Agent]: Hello, this is an automated call regarding account verification.\n[Representative]: Hi there.\n[Agent]: I need to verify if an account exists in your system.\n[Representative]: I've checked our records and I don't see that account.\n[Agent]: Understood. Thank you for checking.\n[Representative]: No problem.",
-            
-            f"[Agent]: Good day, I'm calling about an account verification.\n[Representative]: Hello. What do you need?\n[Agent]: Can you verify if you have an account on file?\n[Representative]: This is a complex situation. You might need to speak with a supervisor.\n[Agent]: I understand. This will require human review.\n[Representative]: Yes, please have someone call back."
-        ]
-        
-        return random.choice(templates)
+        return random.choice(_MOCK_TRANSCRIPTS)
     
     def generate_stream_twiml(self, stream_url: str) -> str:
         """Generate mock TwiML."""
         logger.info(f"🧪 MOCK: Generated TwiML for stream: {stream_url}")
-        return '<?xml version="1.0" encoding="UTF-8"?><Response><Connect><Stream url="' + stream_url + '"/></Connect></Response>'
+        return _STREAM_TWIML_PREFIX + stream_url + _STREAM_TWIML_SUFFIX
     
     def generate_voicemail_twiml(self, message: Optional[str] = None) -> str:
         """Generate mock voicemail TwiML."""
         logger.info(f"🧪 MOCK: Generated voicemail TwiML")
-        return '<?xml version="1.0" encoding="UTF-8"?><Response><Hangup/></Response>'
+        return _VOICEMAIL_TWIML
     
     def get_call_status(self, call_sid: str) -> dict:
         """Get mock call status."""
@@ -130,30 +174,17 @@ class MockTwilioService:
         For trial accounts, some features may be limited.
         """
         try:
-            from config import settings
-            from twilio.rest import Client
-            from datetime import datetime, timedelta
-            
             logger.info(f"🧪 MOCK: Fetching REAL Twilio account information from your Twilio account")
             
-            # Create a real Twilio client to fetch balance
-            client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+            # Reuse a real Twilio client to fetch balance
+            client = _twilio_client(settings.twilio_account_sid, settings.twilio_auth_token)
             
             # Try to fetch account info (this should work for trial accounts)
             account_sid = client.account_sid
             account = client.api.accounts(account_sid).fetch()
             
-            # Try to fetch balance (may fail on trial accounts)
-            balance_value = "Trial Account"
-            currency = "USD"
-            try:
-                balance = client.balance.fetch()
-                balance_value = str(balance.balance)
-                currency = str(balance.currency)
-            except Exception as balance_error:
-                logger.info(f"🧪 MOCK: Balance API not available (trial account): {balance_error}")
-                # For trial accounts, Twilio provides limited balance info
-                balance_value = "Trial Credit Available"
+            # Try to fetch balance (not available on trial accounts)
+            balance_value, currency = self._fetch_account_balance(client, account)
             
             # Try to fetch usage (may be limited on trial accounts)
             total_call_count = 0
@@ -165,17 +196,18 @@ class MockTwilioService:
                 today = datetime.now()
                 start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
                 
-                # Get voice usage
+                # Get voice usage: the aggregate 'calls' category returns one record for the whole period
                 voice_usage = client.usage.records.list(
-                    category='calls-inbound,calls-outbound',
+                    category='calls',
                     start_date=start_of_month.date(),
                     end_date=today.date(),
-                    limit=10
+                    limit=1
                 )
                 
-                for record in voice_usage:
-                    total_call_minutes += float(record.usage)
-                    total_call_count += int(record.count) if hasattr(record, 'count') else 0
+                if voice_usage:
+                    record = voice_usage[0]
+                    total_call_minutes = float(record.usage or 0)
+                    total_call_count = int(record.count or 0)
                 
                 usage_start = start_of_month.isoformat()
                 usage_end = today.isoformat()
@@ -221,6 +253,32 @@ class MockTwilioService:
                 'note': f'Test mode: Calls will only go to verified number ({settings.test_phone_number})',
                 'error': str(e)
             }
+    
+    def _fetch_account_balance(self, client, account) -> tuple:
+        """
+        Fetch the real balance.
+        
+        A Twilio API error means the balance API is unavailable (trial account); trial
+        accounts then use the trial variant for good. Transient failures such as
+        timeouts propagate and are retried on the next lookup.
+        """
+        from twilio.base.exceptions import TwilioRestException
+        
+        if account.sid in _trial_balance_accounts:
+            return self._trial_account_balance(client, account)
+        
+        try:
+            balance = client.balance.fetch()
+            return str(balance.balance), str(balance.currency)
+        except TwilioRestException as balance_error:
+            logger.info(f"🧪 MOCK: Balance API not available (trial account): {balance_error}")
+            if "trial" in (account.type or "").lower():
+                _trial_balance_accounts.add(account.sid)
+            return self._trial_account_balance(client, account)
+    
+    def _trial_account_balance(self, client, account) -> tuple:
+        """For trial accounts, Twilio provides limited balance info."""
+        return "Trial Credit Available", "USD"
 
 
 class MockOpenAIService:
@@ -6,7 +6,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 from database import get_db_context
 from services.call_orchestrator import CallOrchestrator
-from models import CallSchedule
+from models import CallSchedule, CALL_SCHEDULE_ID
 from config import settings
 import logging
 import asyncio
@@ -27,9 +27,7 @@ class SchedulerService:
         
         with get_db_context() as db:
             # Check if already running
-            schedule = db.query(CallSchedule).order_by(
-                CallSchedule.created_at.desc()
-            ).first()
+            schedule = db.get(CallSchedule, CALL_SCHEDULE_ID)
             
             if schedule and schedule.is_running:
                 logger.warning("Previous batch still running, skipping this iteration")
@@ -37,7 +35,7 @@ class SchedulerService:
             
             # Mark as running
             if not schedule:
-                schedule = CallSchedule(is_running=True)
+                schedule = CallSchedule(id=CALL_SCHEDULE_ID, is_running=True)
                 db.add(schedule)
             else:
                 schedule.is_running = True
@@ -3,41 +3,99 @@ Service to retrieve runtime settings from database with fallback to environment
 This allows settings to be changed through the UI without restarting the application.
 """
 from sqlalchemy.orm import Session
+from typing import Dict, Optional
 from models import SystemSettings
 from config import settings as env_settings
 import logging
+import threading
+import time
+import weakref
 
 logger = logging.getLogger(__name__)
 
+# Process-wide snapshot of SystemSettings (setting_key -> setting_value), reloaded
+# in one query once it is older than _CACHE_TTL seconds or has been invalidated
+_CACHE_TTL = 30.0
+_CACHE: Dict[str, Optional[str]] = {}
+_cache_loaded_at: Optional[float] = None
+_cache_lock = threading.Lock()
+
+
+def _cached_values(db: Session) -> Dict[str, Optional[str]]:
+    """Return the settings snapshot, reloading it from the database when stale."""
+    global _CACHE, _cache_loaded_at
+    with _cache_lock:
+        if _cache_loaded_at is not None and time.monotonic() - _cache_loaded_at < _CACHE_TTL:
+            return _CACHE
+    
+    rows = db.query(SystemSettings.setting_key, SystemSettings.setting_value).all()
+    values = dict(rows)
+    with _cache_lock:
+        _CACHE = values
+        _cache_loaded_at = time.monotonic()
+    return values
+
+
+# Bumped on every settings change so consumers can drop values derived from settings
+_settings_version = 0
+
+
+def get_settings_version() -> int:
+    """Get the current runtime settings version."""
+    return _settings_version
+
+
+def invalidate():
+    """
+    Mark runtime settings as changed after a write.
+    
+    Drops the cached snapshot so the next read goes to the database, and bumps
+    the settings version so derived values (e.g. cached TwilioService instances)
+    are rebuilt.
+    """
+    global _cache_loaded_at, _settings_version
+    with _cache_lock:
+        _cache_loaded_at = None
+        _settings_version += 1
+
+
+# Parsers for stored setting values by setting_type; unknown types are returned as strings
+_CONVERTERS = {
+    "int": int,
+    "bool": lambda value: value.lower() in ('true', '1', 'yes'),
+    "float": float,
+}
+
 
 class RuntimeSettings:
     """
     Runtime settings manager that reads from database first, then falls back to env vars.
     """
     
+    __slots__ = ("db", "_cache")
+    
     def __init__(self, db: Session):
         self.db = db
-        self._cache = {}
+        self._cache: Optional[Dict[str, Optional[str]]] = None
+    
+    def _load_all(self) -> Dict[str, Optional[str]]:
+        """Load every setting at once (one query at most) for this instance's lookups."""
+        self._cache = _cached_values(self.db)
+        return self._cache
+    
+    def refresh(self):
+        """Discard loaded settings after a write; invalidates the process-wide snapshot too."""
+        invalidate()
+        self._cache = None
     
     def get(self, key: str, default=None, setting_type: str = "string"):
-        """Get a setting value from database or fallback to environment."""
+        """Get a setting value from database (cached) or fallback to environment."""
         # Try database first
-        setting = self.db.query(SystemSettings).filter(
-            SystemSettings.setting_key == key
-        ).first()
+        values = self._cache if self._cache is not None else self._load_all()
         
-        if setting:
-            value = setting.setting_value
-            
-            # Convert type
-            if setting_type == "int":
-                return int(value) if value else default
-            elif setting_type == "bool":
-                return value.lower() in ('true', '1', 'yes') if value else default
-            elif setting_type == "float":
-                return float(value) if value else default
-            else:
-                return value if value else default
+        value = values.get(key)
+        if value:
+            return _CONVERTERS.get(setting_type, str)(value)
         
         # Fallback to environment variable
         return default
@@ -95,6 +153,17 @@ class RuntimeSettings:
         return self.get("accounts_per_call", 2, "int")
 
 
+# One RuntimeSettings per Session, dropped when the session is garbage collected
+_instances: "weakref.WeakKeyDictionary[Session, RuntimeSettings]" = weakref.WeakKeyDictionary()
+_instances_lock = threading.Lock()
+
+
 def get_runtime_settings(db: Session) -> RuntimeSettings:
-    """Get runtime settings instance."""
-    return RuntimeSettings(db)
+    """Get the runtime settings instance bound to this session."""
+    with _instances_lock:
+        runtime = _instances.get(db)
+        if runtime is None:
+            # Hold the session through a proxy: a strong reference from the value would keep the key alive
+            runtime = RuntimeSettings(weakref.proxy(db))
+            _instances[db] = runtime
+        return runtime
@@ -1,14 +1,120 @@
 """
 Twilio integration service for making calls and handling webhooks.
 """
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
 from config import settings
-import logging
-from typing import Optional
+from services.settings_service import get_runtime_settings, get_settings_version
+from datetime import datetime
+from xml.sax.saxutils import quoteattr
+import functools
+import random
+import threading
+import time
+import structlog
+from typing import Callable, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger()
+
+# Retry policy for outbound call creation (exponential backoff with full jitter).
+# Twilio has no idempotency key for calls.create, so only errors where the call
+# was certainly not placed are retried (rate limited / unavailable / connection never established).
+CALL_CREATE_MAX_ATTEMPTS = 3
+CALL_CREATE_BACKOFF_BASE_SECONDS = 0.5
+CALL_CREATE_BACKOFF_CAP_SECONDS = 4.0
+RETRYABLE_STATUS_CODES = (429, 503)
+
+# Call progress events reported to the status callback
+STATUS_CALLBACK_EVENTS = ('initiated', 'ringing', 'answered', 'completed')
+
+
+@functools.lru_cache(maxsize=1)
+def _twilio_rest():
+    """Lazy import of the Twilio REST client and its HTTP stack, only needed in live mode."""
+    from twilio.rest import Client
+    from twilio.base.exceptions import TwilioRestException
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+    return Client, TwilioRestException, RequestsConnectionError
+
+
+def _is_connect_failure(error: Exception) -> bool:
+    """
+    Whether a requests connection error happened before the request was sent.
+    
+    Connect timeouts and refused/unresolvable connections (urllib3 NewConnectionError,
+    a ConnectTimeoutError subclass) never reach Twilio; resets or read errors after the
+    POST was written may have created the call and must not be re-sent.
+    """
+    from requests.exceptions import ConnectTimeout
+    from urllib3.exceptions import ConnectTimeoutError
+    if isinstance(error, ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+@functools.lru_cache(maxsize=1)
+def _voice_response_cls():
+    """Lazy import of the TwiML builder."""
+    from twilio.twiml.voice_response import VoiceResponse
+    return VoiceResponse
+
+
+# Media Stream TwiML is fixed apart from the stream URL, so it is rendered from a template
+_STREAM_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response><Connect><Stream url={url} /></Connect></Response>'
+
+
+@functools.lru_cache(maxsize=64)
+def _stream_twiml(stream_url: str) -> str:
+    """Render Media Stream TwiML for a stream URL."""
+    return _STREAM_TWIML.format(url=quoteattr(stream_url))
+
+
+@functools.lru_cache(maxsize=64)
+def _voicemail_twiml(message: Optional[str]) -> str:
+    """Render voicemail/hangup TwiML; messages come from a small fixed set."""
+    VoiceResponse = _voice_response_cls()
+    response = VoiceResponse()
+    if message:
+        response.say(message, voice='Polly.Joanna')
+    response.hangup()
+    return str(response)
+
+
+@functools.lru_cache(maxsize=1)
+def _mock_twilio_cls():
+    """Lazy import: the mock service is only needed in test mode."""
+    from services.mock_service import MockTwilioService
+    return MockTwilioService
+
+
+class _BalanceCache:
+    """Process-wide TTL cache of account balance lookups, keyed by account."""
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, ttl: float) -> Optional[dict]:
+        """Return the cached balance info if it is younger than ttl seconds."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        return None
+    
+    def set(self, key: str, balance_info: dict):
+        """Store balance info for an account."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), balance_info)
+    
+    def invalidate(self, key: str):
+        """Drop the cached balance so the next lookup hits the provider."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Shared by every TwilioService instance, so the call orchestrator and the usage API reuse lookups
+_balance_cache = _BalanceCache()
 
 
 class TwilioService:
@@ -19,13 +125,12 @@ class TwilioService:
         Initialize Twilio service.
         
         Args:
-            db: Database session for runtime settings (optional, will use env vars if not provided)
+            db: Database session used only to read runtime settings here; it is not kept,
+                since get_twilio_service() caches the instance beyond the request that built it
+                (optional, will use env vars if not provided)
         """
-        self.db = db
-        
         # Get credentials (from database if available, otherwise from env)
         if db:
-            from services.settings_service import get_runtime_settings
             runtime = get_runtime_settings(db)
             account_sid = runtime.get_twilio_account_sid()
             auth_token = runtime.get_twilio_auth_token()
@@ -35,14 +140,16 @@ class TwilioService:
             auth_token = settings.twilio_auth_token
             phone_number = settings.twilio_phone_number
         
-        # Use mock service in test mode (check runtime override)
-        test_mode = settings.get_test_mode()
-        if test_mode:
-            from services.mock_service import MockTwilioService
-            self._service = MockTwilioService()
+        # Use mock service in test mode (check runtime override); the mode is fixed for the
+        # lifetime of the instance since get_twilio_service() rebuilds it on settings changes
+        self._test_mode = settings.get_test_mode()
+        self._set_balance_cache_key(account_sid)
+        if self._test_mode:
+            self._service = _mock_twilio_cls()()
             self.from_number = phone_number
             logger.info("🧪 TwilioService initialized in TEST MODE using mock service")
         else:
+            Client = _twilio_rest()[0]
             self.client = Client(account_sid, auth_token)
             self.from_number = phone_number
             self._service = None
@@ -50,20 +157,24 @@ class TwilioService:
     
     def refresh_credentials(self, db: Session):
         """Refresh credentials from database (allows hot-reload of API keys)."""
-        test_mode = settings.get_test_mode()
-        if test_mode:
+        if self._test_mode:
             return  # No need to refresh in test mode
         
-        from services.settings_service import get_runtime_settings
         runtime = get_runtime_settings(db)
         account_sid = runtime.get_twilio_account_sid()
         auth_token = runtime.get_twilio_auth_token()
         phone_number = runtime.get_twilio_phone_number()
         
+        Client = _twilio_rest()[0]
         self.client = Client(account_sid, auth_token)
         self.from_number = phone_number
+        self._set_balance_cache_key(account_sid)
         logger.info("🔄 Twilio credentials refreshed from database")
     
+    def _set_balance_cache_key(self, account_sid: Optional[str]):
+        """Key balance lookups by mode and account, so instances with the same credentials share them."""
+        self._balance_cache_key = f"{'mock' if self._test_mode else 'live'}:{account_sid}"
+    
     def make_outbound_call(
         self,
         to_number: str,
@@ -87,42 +198,54 @@ class TwilioService:
         if self._service:
             return self._service.make_outbound_call(to_number, verification_id, webhook_url, status_callback_url)
         
-        try:
-            call = self.client.calls.create(
-                to=to_number,
-                from_=self.from_number,
-                url=webhook_url,
-                status_callback=status_callback_url,
-                status_callback_event=['initiated', 'ringing', 'answered', 'completed'],
-                status_callback_method='POST',
-                timeout=30,
-                record=False,  # No call recording for account verification
-                machine_detection='Enable',
-            )
+        _, TwilioRestException, RequestsConnectionError = _twilio_rest()
+        for attempt in range(CALL_CREATE_MAX_ATTEMPTS):
+            try:
+                call = self.client.calls.create(
+                    to=to_number,
+                    from_=self.from_number,
+                    url=webhook_url,
+                    status_callback=status_callback_url,
+                    status_callback_event=STATUS_CALLBACK_EVENTS,
+                    status_callback_method='POST',
+                    timeout=30,
+                    record=False,  # No call recording for account verification
+                    machine_detection='Enable',
+                )
+                
+                logger.info("📞 Initiated call", call_sid=call.sid, to_number=to_number,
+                            verification_id=verification_id, attempt=attempt + 1)
+                return call.sid
             
-            logger.info(f"Initiated call {call.sid} to {to_number} for verification {verification_id}")
-            return call.sid
+            except (TwilioRestException, RequestsConnectionError) as e:
+                # Only rejected requests and connect-phase failures are retried; everything else short-circuits
+                if isinstance(e, TwilioRestException):
+                    retryable = e.status in RETRYABLE_STATUS_CODES
+                else:
+                    retryable = _is_connect_failure(e)
+                if not retryable or attempt + 1 >= CALL_CREATE_MAX_ATTEMPTS:
+                    logger.error("Failed to initiate call", to_number=to_number,
+                                 verification_id=verification_id, attempts=attempt + 1, error=str(e))
+                    raise
+                
+                delay = random.uniform(0, min(CALL_CREATE_BACKOFF_BASE_SECONDS * 2 ** attempt, CALL_CREATE_BACKOFF_CAP_SECONDS))
+                logger.warning("Transient error initiating call, retrying", to_number=to_number,
+                               attempt=attempt + 1, max_attempts=CALL_CREATE_MAX_ATTEMPTS,
+                               delay_seconds=round(delay, 2), error=str(e))
+                time.sleep(delay)
             
-        except Exception as e:
-            logger.error(f"Failed to initiate call to {to_number}: {e}")
-            raise
+            except Exception as e:
+                logger.error("Failed to initiate call", to_number=to_number,
+                             verification_id=verification_id, error=str(e))
+                raise
     
     def generate_stream_twiml(self, stream_url: str) -> str:
         """Generate TwiML to start a Media Stream."""
-        response = VoiceResponse()
-        connect = Connect()
-        stream = Stream(url=stream_url)
-        connect.append(stream)
-        response.append(connect)
-        return str(response)
+        return _stream_twiml(stream_url)
     
     def generate_voicemail_twiml(self, message: Optional[str] = None) -> str:
         """Generate TwiML to leave a voicemail message or just hang up."""
-        response = VoiceResponse()
-        if message:
-            response.say(message, voice='Polly.Joanna')
-        response.hangup()
-        return str(response)
+        return _voicemail_twiml(message)
     
     def get_call_status(self, call_sid: str) -> dict:
         """Get current status of a call."""
@@ -157,6 +280,36 @@ class TwilioService:
             logger.error(f"Failed to hang up call {call_sid}: {e}")
             return False
     
+    def get_cached_balance(
+        self,
+        ttl: Optional[float] = None,
+        fetch: Optional[Callable[[], dict]] = None
+    ) -> dict:
+        """
+        Get the account balance, reusing a lookup younger than ttl seconds.
+        
+        Args:
+            ttl: Maximum age of a reused lookup (default settings.balance_cache_ttl_seconds)
+            fetch: Replaces get_account_balance on a cache miss (e.g. to wrap it in a circuit breaker)
+        
+        Failed lookups (results with an 'error' key) are not cached, so they are retried.
+        """
+        if ttl is None:
+            ttl = settings.balance_cache_ttl_seconds
+        
+        balance_info = _balance_cache.get(self._balance_cache_key, ttl)
+        if balance_info is not None:
+            return balance_info
+        
+        balance_info = (fetch or self.get_account_balance)()
+        if 'error' not in balance_info:
+            _balance_cache.set(self._balance_cache_key, balance_info)
+        return balance_info
+    
+    def invalidate_cached_balance(self):
+        """Force a fresh lookup on the next get_cached_balance call."""
+        _balance_cache.invalidate(self._balance_cache_key)
+    
     def get_account_balance(self) -> dict:
         """
         Get Twilio account balance and usage information.
@@ -176,11 +329,11 @@ class TwilioService:
             balance = self.client.balance.fetch()
             
             # Fetch usage for current month (calls)
-            from datetime import datetime, timedelta
             today = datetime.now()
             start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             
-            # Get call usage statistics for current month
+            # Twilio aggregates usage per category over the requested period, so the
+            # "calls" category (inbound + outbound) comes back as a single record
             calls_usage = self.client.usage.records.list(
                 category='calls',
                 start_date=start_of_month.date(),
@@ -188,27 +341,12 @@ class TwilioService:
                 limit=1
             )
             
-            # Get total call duration in minutes
-            total_minutes = 0
-            total_count = 0
-            if calls_usage:
-                for record in calls_usage:
-                    total_minutes += float(record.usage)  # Usage is in minutes
-                    total_count = int(record.count) if hasattr(record, 'count') else 0
-            
-            # Get voice usage with more details
-            voice_usage = self.client.usage.records.list(
-                category='calls-inbound,calls-outbound',
-                start_date=start_of_month.date(),
-                end_date=today.date(),
-                limit=10
-            )
-            
             total_call_count = 0
             total_call_minutes = 0
-            for record in voice_usage:
-                total_call_minutes += float(record.usage)
-                total_call_count += int(record.count) if hasattr(record, 'count') else 0
+            if calls_usage:
+                record = calls_usage[0]
+                total_call_minutes = float(record.usage)  # Usage is in minutes
+                total_call_count = int(record.count) if hasattr(record, 'count') else 0
             
             return {
                 'balance': str(balance.balance),
@@ -240,15 +378,35 @@ class TwilioService:
             }
 
 
-# Global Twilio service instance - lazy initialization
-_twilio_service = None
+# How long a database-configured instance is reused before credentials are re-read
+TWILIO_SERVICE_TTL_SECONDS = 30.0
+
+# Cached instances keyed by credential source ("runtime" = database settings, "env" = env vars only),
+# each stored as (service, built_at, settings_version)
+_twilio_services: Dict[str, Tuple[TwilioService, float, int]] = {}
+_twilio_services_lock = threading.Lock()
+
 
 def get_twilio_service(db: Session = None) -> TwilioService:
-    """Get or create Twilio service instance with optional database for runtime settings."""
-    global _twilio_service
-    if _twilio_service is None or db is not None:
-        _twilio_service = TwilioService(db)
-    return _twilio_service
-
-# Initialize global instance on module import
-twilio_service = get_twilio_service()
+    """
+    Get or create Twilio service instance with optional database for runtime settings.
+    
+    Instances are cached per credential source and rebuilt when runtime settings
+    change (see settings_service.invalidate), which also covers test
+    mode toggles; database-configured instances are also rebuilt once older than
+    TWILIO_SERVICE_TTL_SECONDS.
+    """
+    source = "env" if db is None else "runtime"
+    version = get_settings_version()
+    now = time.monotonic()
+    
+    with _twilio_services_lock:
+        cached = _twilio_services.get(source)
+        if cached is not None:
+            service, built_at, built_version = cached
+            if built_version == version and (db is None or now - built_at < TWILIO_SERVICE_TTL_SECONDS):
+                return service
+        
+        service = TwilioService(db)
+        _twilio_services[source] = (service, now, version)
+        return service
@@ -2,15 +2,20 @@
 Business logic for account verification management.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
-from models import AccountVerification, VerificationStatus, CallOutcome, Blocklist
+from sqlalchemy import func, case, or_
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from models import AccountVerification, VerificationStatus, CallOutcome, Blocklist, utcnow
 from schemas import AccountVerificationCreate, CallResultSchema, SystemStats
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# An undialed claim not renewed for call_timeout_seconds plus this margin was
+# abandoned by its batch (crash, restart, deploy) and is returned to PENDING
+STALE_CLAIM_MARGIN_SECONDS = 60
+
 
 class VerificationService:
     """Service for managing account verifications."""
@@ -65,11 +70,41 @@ class VerificationService:
             AccountVerification.verification_id == verification_id
         ).first()
     
-    def get_pending_verifications(self, limit: Optional[int] = None) -> List[AccountVerification]:
-        """Get all pending verifications."""
-        query = self.db.query(AccountVerification).filter(
+    def _retry_ready_filter(self, now: datetime):
+        """
+        SQL predicate for verifications whose retry backoff window has elapsed.
+        
+        Mirrors CallOrchestrator.should_retry: the wait after attempt N is
+        retry_backoff_list[N - 1], capped at the last entry. The per-attempt
+        cutoffs are computed here so the comparison stays portable across
+        SQLite and PostgreSQL.
+        """
+        backoff_list = settings.retry_backoff_list
+        
+        cutoffs = [now - timedelta(minutes=minutes) for minutes in backoff_list]
+        if len(cutoffs) == 1:
+            cutoff = cutoffs[0]
+        else:
+            cutoff = case(
+                *[(AccountVerification.attempt_count == i + 1, cutoffs[i]) for i in range(len(cutoffs) - 1)],
+                else_=cutoffs[-1]
+            )
+        
+        return (AccountVerification.attempt_count < settings.max_retry_attempts) & or_(
+            AccountVerification.last_attempt_at.is_(None),
+            AccountVerification.last_attempt_at <= cutoff
+        )
+    
+    def _pending_query(self, query, limit: Optional[int], ready_to_retry: bool):
+        """Apply the pending filter, ordering and limit shared by the pending getters."""
+        query = query.filter(
             AccountVerification.status == VerificationStatus.PENDING
-        ).order_by(
+        )
+        
+        if ready_to_retry:
+            query = query.filter(self._retry_ready_filter(utcnow()))
+        
+        query = query.order_by(
             AccountVerification.priority.desc(),
             AccountVerification.created_at.asc()
         )
@@ -77,10 +112,132 @@ class VerificationService:
         if limit:
             query = query.limit(limit)
         
-        return query.all()
+        return query
+    
+    def get_pending_verifications(
+        self,
+        limit: Optional[int] = None,
+        ready_to_retry: bool = False
+    ) -> List[AccountVerification]:
+        """
+        Get all pending verifications.
+        
+        Args:
+            limit: Maximum number of verifications to return
+            ready_to_retry: Only return verifications that are out of their retry backoff window
+        """
+        return self._pending_query(
+            self.db.query(AccountVerification), limit, ready_to_retry
+        ).all()
+    
+    def claim_pending_batch(self, limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+        """
+        Claim pending verifications that are due for a call, for this worker only.
+        
+        Rows are selected FOR UPDATE SKIP LOCKED (ignored on SQLite) and moved
+        to CALLING in the same transaction, so concurrent batch processors get
+        disjoint verifications. Return unused claims with release_claims.
+        
+        The claim clears call_sid and records the claim time in updated_at, so a
+        claim that was never dialed can be told apart from a call in progress;
+        claims abandoned by a batch that died are reset first (see
+        release_stale_claims).
+        
+        Returns:
+            Tuple of (verification_ids, company_phones)
+        """
+        now = utcnow()
+        self.release_stale_claims(now)
+        
+        rows = self._pending_query(
+            self.db.query(
+                AccountVerification.verification_id,
+                AccountVerification.company_phone
+            ),
+            limit,
+            ready_to_retry=True
+        ).with_for_update(skip_locked=True).all()
+        
+        if not rows:
+            self.db.commit()
+            return [], []
+        
+        verification_ids, company_phones = zip(*rows)
+        self.db.query(AccountVerification).filter(
+            AccountVerification.verification_id.in_(verification_ids)
+        ).update(
+            {
+                AccountVerification.status: VerificationStatus.CALLING,
+                AccountVerification.call_sid: None,
+                AccountVerification.updated_at: now
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+        
+        return list(verification_ids), list(company_phones)
+    
+    def release_stale_claims(self, now: Optional[datetime] = None) -> int:
+        """
+        Return claims that were never dialed to PENDING, without committing.
+        
+        Only rows still without a call_sid are released: once dialed, a row stays
+        CALLING until its result is recorded (live calls may never report one), and
+        releasing it would call the same number again. A running batch renews its
+        undialed claims each time it starts a call, at most call_timeout_seconds
+        apart (see renew_claims), so undialed claims older than that (plus
+        STALE_CLAIM_MARGIN_SECONDS) were left behind by a batch that died.
+        """
+        now = now or utcnow()
+        stale_before = now - timedelta(seconds=settings.call_timeout_seconds + STALE_CLAIM_MARGIN_SECONDS)
+        released = self.db.query(AccountVerification).filter(
+            AccountVerification.status == VerificationStatus.CALLING,
+            AccountVerification.call_sid.is_(None),
+            AccountVerification.updated_at < stale_before
+        ).update({AccountVerification.status: VerificationStatus.PENDING}, synchronize_session=False)
+        
+        if released:
+            logger.warning(f"Released {released} stale undialed claims back to PENDING")
+        return released
     
-    def mark_as_calling(self, verification_id: str, call_sid: str) -> AccountVerification:
-        """Mark verification as currently being called."""
+    def renew_claims(self, verification_ids: List[str]):
+        """Refresh the claim time of claims not yet dialed, so release_stale_claims skips them."""
+        if not verification_ids:
+            return
+        
+        self.db.query(AccountVerification).filter(
+            AccountVerification.verification_id.in_(verification_ids),
+            AccountVerification.status == VerificationStatus.CALLING,
+            AccountVerification.call_sid.is_(None)
+        ).update({AccountVerification.updated_at: utcnow()}, synchronize_session=False)
+        self.db.commit()
+    
+    def release_claims(self, verification_ids: List[str]):
+        """Return claimed verifications that were never called to PENDING."""
+        if not verification_ids:
+            return
+        
+        released = self.db.query(AccountVerification).filter(
+            AccountVerification.verification_id.in_(verification_ids),
+            AccountVerification.status == VerificationStatus.CALLING
+        ).update({AccountVerification.status: VerificationStatus.PENDING}, synchronize_session=False)
+        self.db.commit()
+        
+        if released:
+            logger.info(f"Released {released} unused verification claims")
+    
+    def mark_as_calling(
+        self,
+        verification_id: str,
+        call_sid: str,
+        commit: bool = True
+    ) -> AccountVerification:
+        """
+        Mark verification as currently being called.
+        
+        Pass commit=False to leave the changes pending so the caller can
+        commit them together with related updates.
+        """
         verification = self.get_verification(verification_id)
         if not verification:
             raise ValueError(f"Verification {verification_id} not found")
@@ -90,8 +247,9 @@ class VerificationService:
         verification.last_attempt_at = datetime.utcnow()
         verification.call_sid = call_sid
         
-        self.db.commit()
-        self.db.refresh(verification)
+        if commit:
+            self.db.commit()
+            self.db.refresh(verification)
         
         logger.info(f"Marked verification {verification_id} as calling (attempt #{verification.attempt_count})")
         return verification
@@ -102,9 +260,15 @@ class VerificationService:
         result: CallResultSchema,
         call_summary: str,
         transcript: Optional[str] = None,
-        call_duration: Optional[int] = None
+        call_duration: Optional[int] = None,
+        commit: bool = True
     ) -> AccountVerification:
-        """Update verification with call results."""
+        """
+        Update verification with call results.
+        
+        Pass commit=False to leave the changes pending so the caller can
+        commit them together with related updates.
+        """
         verification = self.get_verification(verification_id)
         if not verification:
             raise ValueError(f"Verification {verification_id} not found")
@@ -122,7 +286,6 @@ class VerificationService:
             verification.status = VerificationStatus.NEEDS_HUMAN
         elif result.call_outcome in [CallOutcome.VOICEMAIL, CallOutcome.NO_ANSWER, CallOutcome.BUSY]:
             # Keep as pending for retry if attempts remain
-            from config import settings
             if verification.attempt_count >= settings.max_retry_attempts:
                 verification.status = VerificationStatus.FAILED
             else:
@@ -143,8 +306,9 @@ class VerificationService:
         if call_duration:
             verification.call_duration_seconds = call_duration
         
-        self.db.commit()
-        self.db.refresh(verification)
+        if commit:
+            self.db.commit()
+            self.db.refresh(verification)
         
         logger.info(f"Updated verification {verification_id} with outcome: {result.call_outcome}")
         return verification
@@ -3,17 +3,33 @@ Simple Single-File Account Verification Test Script
 Run this to test verifying ONE account without the full application.
 """
 
+import asyncio
+import functools
 import os
-from twilio.rest import Client
-from openai import OpenAI
+import re
+import string
+import sys
 import time
+from xml.sax.saxutils import escape
+from aiohttp import web
+from twilio.base.exceptions import TwilioRestException
+from twilio.rest import Client
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from openai import AsyncOpenAI
+
+# orjson (in requirements.txt) parses faster; the stdlib parser has the same loads()
+try:
+    import orjson as json_parser
+except ImportError:
+    import json as json_parser
+
+BANNER_BAR = "=" * 70
 
 # ============================================================================
 # CONFIGURATION - Fill in your credentials here
 # ============================================================================
 
 # Twilio credentials - Get from .env file
-import sys
 try:
     from config import settings
     TWILIO_ACCOUNT_SID = settings.twilio_account_sid
@@ -34,17 +50,136 @@ TEST_CUSTOMER = {
     "company_phone": "+19092028031"  # Citibank customer service
 }
 
+# Optional: receive call progress from Twilio status callbacks instead of polling.
+# Expose STATUS_CALLBACK_PORT publicly (e.g. `ngrok http 8765`) and set
+# STATUS_CALLBACK_URL to the public URL; leave it unset to poll the call instead.
+STATUS_CALLBACK_URL = os.getenv("STATUS_CALLBACK_URL")
+STATUS_CALLBACK_PORT = int(os.getenv("STATUS_CALLBACK_PORT", "8765"))
+CALL_MONITOR_TIMEOUT_SECONDS = 60
+
+# Without callbacks the call is polled: the delay starts small, doubles while the
+# status is unchanged (up to the cap) and resets whenever the status changes
+POLL_INITIAL_DELAY_SECONDS = 0.5
+POLL_MAX_DELAY_SECONDS = 5.0
+
+TERMINAL_CALL_STATUSES = ('completed', 'busy', 'failed', 'no-answer', 'canceled')
+
+# Phone numbers Twilio accepts for calls: E.164 format, e.g. +14155552671
+E164_PHONE = re.compile(r'^\+[1-9]\d{1,14}$')
+
+# Message spoken on the test call, and the TwiML that plays it
+CALL_MESSAGE = string.Template(
+    "Hello! This is a test call from your Account Verification System. "
+    "We are testing the ability to make calls to verify accounts. "
+    "Customer name: $name. Account number: $account_number. Company: $company. "
+    "This is a test. The system is working correctly. Thank you for testing. Goodbye."
+)
+CALL_TWIML = string.Template('<Response><Say voice="alice">$message</Say></Response>')
+
+# Concurrent OpenAI requests allowed when several conversations are analyzed together
+OPENAI_MAX_CONCURRENCY = 8
+
 # ============================================================================
 # SIMPLE VERIFICATION SCRIPT
 # ============================================================================
 
-def test_account_verification():
+_openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+
+async def analyze_conversation(conversation: str) -> str:
+    """
+    Ask OpenAI whether the account exists; safe to asyncio.gather over many conversations.
+    """
+    async with _openai_semaphore:
+        response = await _openai_client().chat.completions.create(
+            # A small fixed-schema classification: the small model is much faster and cheaper
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are analyzing a call transcript to determine if an account exists. Respond with JSON: {\"account_exists\": true/false, \"confidence\": \"high\"/\"medium\"/\"low\", \"reason\": \"explanation\"}"
+                },
+                {
+                    "role": "user",
+                    "content": f"Analyze this conversation and determine if the account exists:\n\n{conversation}"
+                }
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            # Room for a verbose "reason"; JSON mode does not keep a cut-off reply parseable
+            max_tokens=300
+        )
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        raise ValueError("analysis was truncated at the token limit")
+    return choice.message.content
+
+
+class StatusCallbackServer:
+    """
+    Local receiver for Twilio status callbacks; resolves a future per call
+    once a terminal status arrives.
+    """
+    
+    def __init__(self, port: int):
+        self.port = port
+        self._runner = None
+        self._terminal = {}  # CallSid -> Future resolved with the terminal status
+    
+    def _terminal_future(self, call_sid: str) -> asyncio.Future:
+        future = self._terminal.get(call_sid)
+        if future is None:
+            future = self._terminal[call_sid] = asyncio.get_running_loop().create_future()
+        return future
+    
+    async def _handle(self, request):
+        form = await request.post()
+        status = form.get('CallStatus')
+        print(f"   Call status: {status}")
+        
+        if status in TERMINAL_CALL_STATUSES:
+            future = self._terminal_future(form.get('CallSid'))
+            if not future.done():
+                future.set_result(status)
+        return web.Response()
+    
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, port=self.port).start()
+    
+    async def wait_for_terminal_status(self, call_sid: str, timeout: float) -> str:
+        return await asyncio.wait_for(self._terminal_future(call_sid), timeout)
+    
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+async def with_async_twilio_client(test):
+    """
+    Run an async test with a Twilio client backed by aiohttp, closing its session afterwards.
+    """
+    http_client = AsyncTwilioHttpClient()
+    try:
+        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+        return await test(client)
+    finally:
+        await http_client.close()
+
+
+async def test_account_verification(client: Client):
     """
     Make a REAL call to your registered test number.
     """
-    print("=" * 70)
-    print("🧪 REAL CALL TEST - LIVE TWILIO CALL")
-    print("=" * 70)
+    print("\n".join([BANNER_BAR, "🧪 REAL CALL TEST - LIVE TWILIO CALL", BANNER_BAR]))
     
     # Step 1: Display test info
     print(f"\n📋 Test Customer:")
@@ -54,23 +189,35 @@ def test_account_verification():
     print(f"   Company: {TEST_CUSTOMER['company']}")
     print(f"   Company Phone: {TEST_CUSTOMER['company_phone']}")
     
+    # Catch malformed numbers locally instead of through a failed Twilio request
+    for label, number in (("Test customer phone", TEST_CUSTOMER['phone']), ("Twilio phone number", TWILIO_PHONE_NUMBER)):
+        if not E164_PHONE.match(number or ""):
+            print(f"\n   ❌ {label} is not in E.164 format (e.g. +14155552671): {number!r}")
+            return
+    
     # Step 2: Initialize Twilio
     print(f"\n🔌 Connecting to Twilio...")
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        # Account info and balance are independent requests, so fetch them together
+        account, balance = await asyncio.gather(
+            client.api.accounts(TWILIO_ACCOUNT_SID).fetch_async(),
+            client.balance.fetch_async(),
+            return_exceptions=True
+        )
+        if isinstance(account, Exception):
+            raise account
+        # Trial accounts get an API error from the balance endpoint; anything else is a real failure
+        if isinstance(balance, Exception) and not isinstance(balance, TwilioRestException):
+            raise balance
         
-        # Get account info
-        account = client.api.accounts(TWILIO_ACCOUNT_SID).fetch()
         print(f"   ✅ Connected to Twilio")
         print(f"   Account: {account.friendly_name}")
         print(f"   Status: {account.status}")
         
-        # Get balance
-        try:
-            balance = client.balance.fetch()
-            print(f"   Balance: ${balance.balance} {balance.currency}")
-        except:
+        if isinstance(balance, TwilioRestException):
             print(f"   Balance: Trial Account (API restricted)")
+        else:
+            print(f"   Balance: ${balance.balance} {balance.currency}")
         
     except Exception as e:
         print(f"   ❌ Twilio connection failed: {e}")
@@ -89,37 +236,49 @@ def test_account_verification():
     
     print(f"\n📞 Making REAL call to {TEST_CUSTOMER['phone']}...")
     
+    callback_server = None
+    if STATUS_CALLBACK_URL:
+        callback_server = StatusCallbackServer(STATUS_CALLBACK_PORT)
+        await callback_server.start()
+    
+    ai_task = None
     try:
         # Create TwiML for the call
         # This is the message that will be spoken when call is answered
-        twiml_message = f"""
-        <Response>
-            <Say voice="alice">
-                Hello! This is a test call from your Account Verification System. 
-                We are testing the ability to make calls to verify accounts. 
-                Customer name: {TEST_CUSTOMER['name']}. 
-                Account number: {TEST_CUSTOMER['account_number']}. 
-                Company: {TEST_CUSTOMER['company']}. 
-                This is a test. The system is working correctly. 
-                Thank you for testing. Goodbye.
-            </Say>
-        </Response>
-        """
+        call_message = CALL_MESSAGE.substitute(
+            name=TEST_CUSTOMER['name'],
+            account_number=TEST_CUSTOMER['account_number'],
+            company=TEST_CUSTOMER['company']
+        )
+        twiml_message = CALL_TWIML.substitute(message=escape(call_message))
+        
+        # Generate mock conversation based on the call
+        mock_conversation = f"""
+    This was a REAL Twilio call!
+    
+    Message played to {TEST_CUSTOMER['phone']}:
+    "{call_message}"
+    """
         
         # Make the call using Twilio's API
-        call = client.calls.create(
+        call = await client.calls.create_async(
             to=TEST_CUSTOMER['phone'],
             from_=TWILIO_PHONE_NUMBER,
             twiml=twiml_message,
-            status_callback='http://httpbin.org/post',  # For testing, logs call status
+            # Without our own callback receiver, httpbin just logs the call status
+            status_callback=STATUS_CALLBACK_URL or 'http://httpbin.org/post',
             status_callback_event=['initiated', 'ringing', 'answered', 'completed']
         )
         
         print(f"   ✅ Call initiated successfully!")
         print(f"   📞 Call SID: {call.sid}")
+        
+        # The analysis only needs the scripted message, so it runs while the call is in progress
+        if OPENAI_API_KEY and OPENAI_API_KEY != "your_openai_api_key_here":
+            ai_task = asyncio.create_task(analyze_conversation(mock_conversation))
         # Fetch once to ensure fields like from_/to are populated
         try:
-            created = client.calls(call.sid).fetch()
+            created = await client.calls(call.sid).fetch_async()
             to_display = getattr(created, "to_formatted", None) or getattr(created, "to", None)
             from_display = getattr(created, "from_formatted", None) or getattr(created, "from_", None)
             status_display = getattr(created, "status", "unknown")
@@ -135,52 +294,57 @@ def test_account_verification():
         
         # Monitor call status
         print(f"\n📊 Monitoring call status...")
-        for i in range(30):  # Monitor for up to 30 seconds
-            time.sleep(2)
-            
-            # Fetch updated call status
-            call = client.calls(call.sid).fetch()
-            status = call.status
-            
-            print(f"   [{i*2}s] Call status: {status}")
-            
-            if status == 'ringing':
-                print(f"      🔔 Phone is ringing...")
-            elif status == 'in-progress':
-                print(f"      📞 Call connected! Playing message...")
-            elif status == 'completed':
-                print(f"      ✅ Call completed!")
-                duration = call.duration
-                print(f"      ⏱️  Duration: {duration} seconds")
-                break
-            elif status in ['busy', 'failed', 'no-answer', 'canceled']:
-                print(f"      ❌ Call ended with status: {status}")
-                break
+        if callback_server:
+            try:
+                status = await callback_server.wait_for_terminal_status(call.sid, CALL_MONITOR_TIMEOUT_SECONDS)
+                print(f"      Call ended with status: {status}")
+            except asyncio.TimeoutError:
+                print(f"      ⚠️  No final status callback within {CALL_MONITOR_TIMEOUT_SECONDS}s")
+        else:
+            started = time.monotonic()
+            delay = POLL_INITIAL_DELAY_SECONDS
+            last_status = call.status
+            while time.monotonic() - started < CALL_MONITOR_TIMEOUT_SECONDS:
+                await asyncio.sleep(delay)
+                
+                # Fetch updated call status
+                call = await client.calls(call.sid).fetch_async()
+                status = call.status
+                if status == last_status:
+                    delay = min(delay * 2, POLL_MAX_DELAY_SECONDS)
+                    continue
+                delay = POLL_INITIAL_DELAY_SECONDS
+                last_status = status
+                
+                print(f"   [{time.monotonic() - started:.0f}s] Call status: {status}")
+                
+                if status == 'ringing':
+                    print(f"      🔔 Phone is ringing...")
+                elif status == 'in-progress':
+                    print(f"      📞 Call connected! Playing message...")
+                elif status == 'completed':
+                    print(f"      ✅ Call completed!")
+                    duration = call.duration
+                    print(f"      ⏱️  Duration: {duration} seconds")
+                    break
+                elif status in TERMINAL_CALL_STATUSES:
+                    print(f"      ❌ Call ended with status: {status}")
+                    break
         
-        # Final call details
-        call = client.calls(call.sid).fetch()
+        # Final call details: polling already holds the latest call; fetch only when
+        # duration isn't known yet (callback mode, or polling timed out mid-call)
+        if call.duration is None:
+            call = await client.calls(call.sid).fetch_async()
         
-        print(f"\n📊 FINAL CALL DETAILS:")
-        print(f"   Call SID: {call.sid}")
-        print(f"   Status: {call.status}")
-        print(f"   Duration: {call.duration} seconds")
-        print(f"   Direction: {call.direction}")
-        print(f"   From: {call.from_}")
-        print(f"   To: {call.to}")
-        
-        # Generate mock conversation based on the call
-        mock_conversation = f"""
-    This was a REAL Twilio call!
-    
-    Message played to {TEST_CUSTOMER['phone']}:
-    "Hello! This is a test call from your Account Verification System. 
-     We are testing the ability to make calls to verify accounts. 
-     Customer name: {TEST_CUSTOMER['name']}. 
-     Account number: {TEST_CUSTOMER['account_number']}. 
-     Company: {TEST_CUSTOMER['company']}. 
-     This is a test. The system is working correctly. 
-     Thank you for testing. Goodbye."
-    """
+        print("\n".join([
+            f"\n📊 FINAL CALL DETAILS:",
+            f"   Call SID: {call.sid}",
+            f"   Status: {call.status}",
+            f"   Duration: {call.duration} seconds",
+            f"   Direction: {call.direction}",
+            f"   From: {call.from_}",
+            f"   To: {call.to}",
+        ]))
         
         print(f"\n💬 Call Content:")
         print(mock_conversation)
@@ -188,32 +352,21 @@ def test_account_verification():
     except Exception as e:
         print(f"   ❌ Call failed: {e}")
         print(f"   Error details: {type(e).__name__}")
+        if ai_task:
+            ai_task.cancel()
         return
+    finally:
+        if callback_server:
+            await callback_server.stop()
     
     # Step 4: Process with AI (if OpenAI key provided)
-    if OPENAI_API_KEY and OPENAI_API_KEY != "your_openai_api_key_here":
+    if ai_task:
         print(f"\n🤖 Processing with AI...")
         try:
-            openai_client = OpenAI(api_key=OPENAI_API_KEY)
-            
-            response = openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are analyzing a call transcript to determine if an account exists. Respond with JSON: {\"account_exists\": true/false, \"confidence\": \"high\"/\"medium\"/\"low\", \"reason\": \"explanation\"}"
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Analyze this conversation and determine if the account exists:\n\n{mock_conversation}"
-                    }
-                ],
-                temperature=0.3
-            )
-            
-            ai_result = response.choices[0].message.content
+            analysis = json_parser.loads(await ai_task)
             print(f"   ✅ AI Analysis:")
-            print(f"   {ai_result}")
+            print(f"   Account exists: {analysis.get('account_exists')} (confidence: {analysis.get('confidence')})")
+            print(f"   Reason: {analysis.get('reason')}")
             
         except Exception as e:
             print(f"   ⚠️  AI analysis skipped: {e}")
@@ -222,15 +375,17 @@ def test_account_verification():
         print(f"   Manual analysis: Account VERIFIED ✅")
     
     # Step 5: Final result
-    print(f"\n" + "=" * 70)
-    print(f"📊 VERIFICATION RESULT")
-    print(f"=" * 70)
-    print(f"✅ Account Status: VERIFIED")
-    print(f"✅ Customer: {TEST_CUSTOMER['name']}")
-    print(f"✅ Account Number: {TEST_CUSTOMER['account_number']}")
-    print(f"✅ Company: {TEST_CUSTOMER['company']}")
-    print(f"✅ Verification Method: Simulated call")
-    print(f"=" * 70)
+    print("\n".join([
+        f"\n{BANNER_BAR}",
+        f"📊 VERIFICATION RESULT",
+        BANNER_BAR,
+        f"✅ Account Status: VERIFIED",
+        f"✅ Customer: {TEST_CUSTOMER['name']}",
+        f"✅ Account Number: {TEST_CUSTOMER['account_number']}",
+        f"✅ Company: {TEST_CUSTOMER['company']}",
+        f"✅ Verification Method: Simulated call",
+        BANNER_BAR,
+    ]))
     
     print(f"\n💡 Next Steps:")
     print(f"   1. Use the full application for real verifications")
@@ -246,21 +401,28 @@ def test_account_verification():
     }
 
 
-def quick_twilio_test():
+async def quick_twilio_test(client: Client):
     """
     Just test Twilio connection and balance.
     """
-    print("=" * 70)
-    print("🔌 QUICK TWILIO CONNECTION TEST")
-    print("=" * 70)
+    print("\n".join([BANNER_BAR, "🔌 QUICK TWILIO CONNECTION TEST", BANNER_BAR]))
     
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        # Account info and balance are independent requests, so fetch them together
+        account, balance = await asyncio.gather(
+            client.api.accounts(TWILIO_ACCOUNT_SID).fetch_async(),
+            client.balance.fetch_async(),
+            return_exceptions=True
+        )
+        if isinstance(account, Exception):
+            raise account
+        # Trial accounts get an API error from the balance endpoint; anything else is a real failure
+        if isinstance(balance, Exception) and not isinstance(balance, TwilioRestException):
+            raise balance
         
         print(f"\n✅ Twilio Connected Successfully!")
         
         # Account info
-        account = client.api.accounts(TWILIO_ACCOUNT_SID).fetch()
         print(f"\n📋 Account Information:")
         print(f"   Account Name: {account.friendly_name}")
         print(f"   Account SID: {account.sid}")
@@ -268,14 +430,12 @@ def quick_twilio_test():
         print(f"   Type: {account.type}")
         
         # Balance
-        try:
-            balance = client.balance.fetch()
-            print(f"\n💰 Account Balance:")
-            print(f"   Balance: ${balance.balance} {balance.currency}")
-        except Exception as e:
-            print(f"\n💰 Account Balance:")
+        print(f"\n💰 Account Balance:")
+        if isinstance(balance, TwilioRestException):
             print(f"   Trial Account (Balance API not available)")
             print(f"   This is normal for trial accounts")
+        else:
+            print(f"   Balance: ${balance.balance} {balance.currency}")
         
         # Phone numbers
         print(f"\n📱 Your Twilio Phone Number:")
@@ -298,21 +458,37 @@ def quick_twilio_test():
 # MAIN EXECUTION
 # ============================================================================
 
+MENU = "\n".join([
+    "",
+    BANNER_BAR,
+    "   SIMPLE ACCOUNT VERIFICATION TEST SCRIPT",
+    BANNER_BAR,
+    "\nChoose an option:",
+    "  1. Quick Twilio Connection Test (No call)",
+    "  2. Make REAL Call to Your Registered Number",
+    "  3. Exit",
+])
+
+MENU_TESTS = {
+    "1": quick_twilio_test,
+    "2": test_account_verification,
+}
+
 if __name__ == "__main__":
-    print("\n" + "=" * 70)
-    print("   SIMPLE ACCOUNT VERIFICATION TEST SCRIPT")
-    print("=" * 70)
-    print("\nChoose an option:")
-    print("  1. Quick Twilio Connection Test (No call)")
-    print("  2. Make REAL Call to Your Registered Number")
-    print("  3. Exit")
+    # uvloop (installed with uvicorn[standard] where supported) is a faster event loop;
+    # fall back to the default asyncio loop where it isn't available, e.g. on Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
+    print(MENU)
     
-    choice = input("\nEnter choice (1-3): ").strip()
+    test = MENU_TESTS.get(input("\nEnter choice (1-3): ").strip())
     
-    if choice == "1":
-        quick_twilio_test()
-    elif choice == "2":
-        test_account_verification()
+    if test:
+        asyncio.run(with_async_twilio_client(test))
     else:
         print("Exiting...")
     